@@ -1,12 +1,15 @@
 """
 Metric Query API - Main Application
 """
+import os
 from flask import Flask
 from flasgger import Swagger
 from flask_cors import CORS
 
 # Import configuration
 from config import get_swagger_template
+from models.kernels import warmup
+from utils.utils import ORJSONProvider, orjson
 
 # Import route blueprints
 from routes import (
@@ -16,6 +19,9 @@ from routes import (
 def create_app():
     """Create and configure the Flask application"""
     app = Flask(__name__)
+    # Parse and serialize JSON with orjson when it is installed
+    if orjson is not None:
+        app.json = ORJSONProvider(app)
     # Configure CORS with more explicit settings
     CORS(app, resources={r"/*": {
         "origins": ["http://localhost:3000", "http://127.0.0.1:3000", "*"],
@@ -36,6 +42,11 @@ def create_app():
     app.register_blueprint(extensions_bp, url_prefix='')
     app.register_blueprint(tests_bp, url_prefix='/test')
     
+    # Run the aggregation kernels once so the first request does not pay
+    # for loading them; set WARMUP=0 to skip
+    if os.environ.get('WARMUP', '1') == '1':
+        warmup()
+    
     return app
 
 # Create the application instance
@@ -160,10 +160,10 @@ if __name__ == "__main__":
 
     print("Basic metric samples:")
     for sample in basic_samples:
-        time_str = datetime.datetime.fromtimestamp(sample["timestamp"] / 1000).strftime('%Y-%m-%d %H:%M:%S')
+        time_str = datetime.datetime.fromtimestamp(sample["timestamp"] / 1000).isoformat(sep=' ', timespec='seconds')
         print(f"Value: {sample['value']}, Timestamp: {time_str}")
 
     print("\nExtended metric samples:")
     for sample in extended_samples:
-        time_str = datetime.datetime.fromtimestamp(sample["timestamp"] / 1000).strftime('%Y-%m-%d %H:%M:%S')
+        time_str = datetime.datetime.fromtimestamp(sample["timestamp"] / 1000).isoformat(sep=' ', timespec='seconds')
         print(f"Label: {sample['label']}, Value: {sample['value']}, Timestamp: {time_str}")
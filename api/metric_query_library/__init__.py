@@ -62,18 +62,40 @@ except ImportError:
     logger.info("maturin_import_hook not found. Consider installing it for development.")
 
 # Define placeholder classes for when the Rust module isn't available
+# The metric placeholders use __slots__ so that large stores of them carry no
+# per-instance __dict__, like the Rust classes that replace them
+
 class Metric:
+    __slots__ = ('value', 'timestamp', 'label')
+
     def __init__(self, value=0, timestamp=0, label=None):
         self.value = value
         self.timestamp = timestamp
         self.label = label
 
+    @classmethod
+    def from_arrays(cls, values, timestamps):
+        if len(values) != len(timestamps):
+            raise ValueError("values and timestamps must have the same length")
+        return [cls(value, timestamp) for value, timestamp in zip(values.tolist(), timestamps.tolist())]
+
 class LabeledMetric:
+    __slots__ = ('label', 'value', 'timestamp')
+
     def __init__(self, label="", value=0, timestamp=0):
         self.label = label
         self.value = value
         self.timestamp = timestamp
 
+    @classmethod
+    def from_arrays(cls, labels, values, timestamps):
+        if not len(labels) == len(values) == len(timestamps):
+            raise ValueError("labels, values and timestamps must have the same length")
+        return [
+            cls(label, value, timestamp)
+            for label, value, timestamp in zip(labels, values.tolist(), timestamps.tolist())
+        ]
+
 class Filter:
     def __init__(self, filter_type="", value=0):
         self.filter_type = filter_type
@@ -126,6 +148,26 @@ class MetricPipeline:
         self.operations.append(('filter_by_labels', (filter_type, labels or [])))
         return self
         
+    def clone(self):
+        """Copy the pipeline, sharing its metrics"""
+        pipeline = MetricPipeline(self.metrics)
+        pipeline.operations = list(self.operations)
+        return pipeline
+        
+    def execute_fused(self, ops):
+        """Execute a list of (operation, *args) tuples in one call"""
+        pipeline = self.clone()
+        pipeline.operations.extend((op[0], tuple(op[1:])) for op in ops)
+        return pipeline.execute()
+        
+    def execute_columns(self, ops=None):
+        """Execute the pipeline and return (values, timestamps, labels) columns"""
+        import numpy as np
+        result = self.execute_fused(ops or [])
+        values = np.fromiter((m.value for m in result), dtype=np.int64, count=len(result))
+        timestamps = np.fromiter((m.timestamp for m in result), dtype=np.int64, count=len(result))
+        return values, timestamps, [getattr(m, 'label', None) for m in result]
+        
     def execute(self):
         """
         Execute the pipeline operations in sequence.
@@ -151,6 +193,10 @@ def transform(metrics, transformations):
     logging.warning("Using Python fallback implementation for transform()")
     return metrics
 
+def sum_values(metrics):
+    """Sum the values of a list of metrics"""
+    return sum(metric.value for metric in metrics)
+
 def _create_raw_pipeline(metrics):
     """Create a new pipeline with the given metrics"""
     import logging
@@ -182,6 +228,7 @@ try:
         MetricPipeline = rust_lib.MetricPipeline
         TransformationRegistry = rust_lib.TransformationRegistry
         transform = rust_lib.transform
+        sum_values = rust_lib.sum_values
         _create_raw_pipeline = rust_lib.create_pipeline
         get_registry = rust_lib.get_registry
 except ImportError as e:
@@ -222,7 +269,7 @@ __all__ = [
     'validate_metric', 'validate_labeled_metric', 'validate_transformation',
     
     # Main transformation interfaces
-    'create_pipeline', 'transform_metrics', 'transform_metrics_to_dicts',
+    'sum_values', 'create_pipeline', 'transform_metrics', 'transform_metrics_to_dicts',
     'MetricTransformationPipeline',
     
     # Label operations
@@ -384,4 +384,4 @@ def create_pipeline(metrics: List[Union[Metric, Dict[str, Any]]]) -> MetricTrans
     Returns:
         A new MetricTransformationPipeline
     """
-    return MetricTransformationPipeline(metrics)
\ No newline at end of file
+    return MetricTransformationPipeline(metrics)
@@ -1,4 +1,9 @@
 """
 Models package for the Metric Query API.
 """
-from models.store import metrics_store, labeled_metrics_store
\ No newline at end of file
+from models.store import (
+    metrics_store, labeled_metrics_store, MetricStore, LabeledMetricStore, ColumnView
+)
+from models.pipeline import (
+    ColumnarPipeline, PlannedPipeline, create_labeled_pipeline, create_planned_pipeline
+)
\ No newline at end of file
@@ -0,0 +1,333 @@
+"""
+Numeric kernels used by the column-oriented pipelines.
+
+The kernels are compiled with Numba when it is installed and fall back to
+equivalent NumPy implementations otherwise.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+import os
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
+# Integer codes for the aggregation types, as passed to the compiled kernels
+AGGREGATION_CODES = {
+    'sum': 0,
+    'avg': 1,
+    'min': 2,
+    'max': 3,
+}
+
+_SUM = 0
+_AVG = 1
+_MIN = 2
+_MAX = 3
+
+# Streams at least this long are grouped by the multi-threaded kernels; below
+# it the cost of handing work to other threads outweighs the gain
+PARALLEL_MIN_ROWS = 100_000
+
+# Threads used to group large streams when Numba is not installed
+GROUPING_THREADS = os.cpu_count() or 1
+
+def _bucketize(timestamps, bucket_seconds):
+    """Floor each timestamp to the start of its bucket"""
+    buckets = np.empty(len(timestamps), dtype=np.int64)
+    for i in range(len(timestamps)):
+        buckets[i] = (timestamps[i] // bucket_seconds) * bucket_seconds
+    return buckets
+
+# Bucketing specialized to each time grouping. With the bucket width a
+# compile-time constant, LLVM replaces the division with a multiply and shift.
+_bucketize_inline = _bucketize
+
+def _bucketize_minute(timestamps):
+    return _bucketize_inline(timestamps, 60)
+
+def _bucketize_hour(timestamps):
+    return _bucketize_inline(timestamps, 3600)
+
+def _bucketize_day(timestamps):
+    return _bucketize_inline(timestamps, 86400)
+
+if njit is not None:
+    _bucketize_inline = njit(inline='always')(_bucketize)
+    bucketize = njit('int64[:](int64[:], int64)', cache=True)(_bucketize)
+    BUCKETIZERS = {
+        60: njit('int64[:](int64[:])', cache=True)(_bucketize_minute),
+        3600: njit('int64[:](int64[:])', cache=True)(_bucketize_hour),
+        86400: njit('int64[:](int64[:])', cache=True)(_bucketize_day),
+    }
+else:
+    bucketize = None
+    BUCKETIZERS = {}
+
+def _group_by_bucket_i64(buckets, values, aggregation):
+    """
+    Aggregate int32 or int64 values per time bucket with explicit loops.
+
+    Written in the subset of Python that Numba compiles; buckets holds the
+    start of each row's time bucket, see apply for the other arguments.
+    """
+    n = len(buckets)
+    in_order = True
+    for i in range(1, n):
+        if buckets[i] < buckets[i - 1]:
+            in_order = False
+            break
+    if in_order:
+        order = np.arange(n)
+    else:
+        order = np.argsort(buckets, kind='mergesort')
+
+    out_timestamps = np.empty(n, dtype=np.int64)
+    out_values = np.empty(n, dtype=np.int64)
+    group = -1
+    count = 0
+    for j in range(n):
+        i = order[j]
+        bucket = buckets[i]
+        value = values[i]
+        if group < 0 or bucket != out_timestamps[group]:
+            if group >= 0 and aggregation == _AVG:
+                total = out_values[group]
+                quotient = (total if total >= 0 else -total) // count
+                out_values[group] = quotient if total >= 0 else -quotient
+            group += 1
+            out_timestamps[group] = bucket
+            out_values[group] = value
+            count = 1
+        else:
+            count += 1
+            if aggregation == _MIN:
+                if value < out_values[group]:
+                    out_values[group] = value
+            elif aggregation == _MAX:
+                if value > out_values[group]:
+                    out_values[group] = value
+            else:
+                out_values[group] += value
+
+    if group >= 0 and aggregation == _AVG:
+        total = out_values[group]
+        quotient = (total if total >= 0 else -total) // count
+        out_values[group] = quotient if total >= 0 else -quotient
+    return out_timestamps[:group + 1].copy(), out_values[:group + 1].copy()
+
+# Kernel signatures for int64 and int32 value columns; results are always int64
+_SIGNATURES = [
+    'Tuple((int64[:], int64[:]))(int64[:], int64[:], int64)',
+    'Tuple((int64[:], int64[:]))(int64[:], int32[:], int64)',
+]
+
+if njit is not None:
+    # Declaring the signatures compiles the kernel at import time rather than
+    # on the first request; cache=True reuses the machine code across restarts.
+    group_by_bucket_i64 = njit(_SIGNATURES, cache=True)(_group_by_bucket_i64)
+else:
+    group_by_bucket_i64 = None
+
+def _group_by_bucket_i64_parallel(buckets, values, aggregation):
+    """
+    Multi-threaded variant of _group_by_bucket_i64.
+
+    Bucket boundary detection runs as a parallel loop, then each bucket is
+    reduced independently, so buckets are spread across threads. Only the
+    sort of out-of-order input is serial.
+    """
+    n = len(buckets)
+    disorder = 0
+    for i in prange(1, n):
+        if buckets[i] < buckets[i - 1]:
+            disorder += 1
+    if disorder == 0:
+        order = np.arange(n)
+    else:
+        order = np.argsort(buckets, kind='mergesort')
+
+    is_start = np.empty(n, dtype=np.bool_)
+    for j in prange(n):
+        is_start[j] = j == 0 or buckets[order[j]] != buckets[order[j - 1]]
+    starts = np.nonzero(is_start)[0]
+    groups = len(starts)
+
+    out_timestamps = np.empty(groups, dtype=np.int64)
+    out_values = np.empty(groups, dtype=np.int64)
+    for g in prange(groups):
+        lo = starts[g]
+        hi = starts[g + 1] if g + 1 < groups else n
+        out_timestamps[g] = buckets[order[lo]]
+        # Accumulate in int64 whatever the width of the value column
+        acc = np.int64(values[order[lo]])
+        for j in range(lo + 1, hi):
+            value = values[order[j]]
+            if aggregation == _MIN:
+                if value < acc:
+                    acc = value
+            elif aggregation == _MAX:
+                if value > acc:
+                    acc = value
+            else:
+                acc += value
+        if aggregation == _AVG:
+            quotient = (acc if acc >= 0 else -acc) // (hi - lo)
+            acc = quotient if acc >= 0 else -quotient
+        out_values[g] = acc
+    return out_timestamps, out_values
+
+if njit is not None:
+    group_by_bucket_i64_parallel = njit(_SIGNATURES, parallel=True, cache=True)(_group_by_bucket_i64_parallel)
+else:
+    group_by_bucket_i64_parallel = None
+
+def _avg_reduceat(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Per-segment average, rounding toward zero like the Rust aggregations"""
+    totals = np.add.reduceat(values, starts)
+    counts = np.diff(np.r_[starts, len(values)])
+    quotient = np.abs(totals) // counts
+    return np.where(totals < 0, -quotient, quotient)
+
+# Segment reduction for each aggregation type: fn(values, starts) returns one
+# result per segment, where segment i spans starts[i] up to starts[i + 1]
+AGG_FNS = {
+    'sum': np.add.reduceat,
+    'avg': _avg_reduceat,
+    'min': np.minimum.reduceat,
+    'max': np.maximum.reduceat,
+}
+
+_WHOLE_STREAM = np.zeros(1, dtype=np.intp)
+
+def _bucket_segments(timestamps: np.ndarray, values: np.ndarray, bucket_seconds: int):
+    """Order rows by time bucket and find where each bucket starts"""
+    buckets = (timestamps // bucket_seconds) * bucket_seconds
+    # Metrics usually arrive in time order, in which case no sort is needed
+    if len(buckets) > 1 and not (buckets[1:] >= buckets[:-1]).all():
+        order = np.argsort(buckets, kind='stable')
+        buckets = buckets[order]
+        values = values[order]
+
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    return buckets[starts], values, starts
+
+# Reduction that merges per-chunk partial results for each aggregation type;
+# partial averages are carried as sums and divided once merged
+_MERGE_FNS = {
+    'sum': np.add.reduceat,
+    'avg': np.add.reduceat,
+    'min': np.minimum.reduceat,
+    'max': np.maximum.reduceat,
+}
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+def _grouping_executor() -> ThreadPoolExecutor:
+    """Thread pool for chunked grouping, created on first use"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=GROUPING_THREADS, thread_name_prefix='group-by')
+    return _executor
+
+def _partial_groups(timestamps: np.ndarray, values: np.ndarray, bucket_seconds: int, aggregation: str):
+    """Per-bucket partial aggregates and row counts of one chunk"""
+    keys, values, starts = _bucket_segments(timestamps, values, bucket_seconds)
+    counts = np.diff(np.r_[starts, len(values)])
+    return keys, _MERGE_FNS[aggregation](values, starts), counts
+
+def _group_chunked(
+    values: np.ndarray,
+    timestamps: np.ndarray,
+    aggregation: str,
+    bucket_seconds: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Group a large stream by splitting it across threads.
+
+    Each thread aggregates a contiguous chunk into per-bucket partials (NumPy
+    releases the GIL while it sorts and reduces), then the partials of
+    buckets that span chunks are merged.
+    """
+    bounds = np.linspace(0, len(values), GROUPING_THREADS + 1).astype(np.intp)
+    parts = list(_grouping_executor().map(
+        lambda chunk: _partial_groups(
+            timestamps[chunk[0]:chunk[1]], values[chunk[0]:chunk[1]], bucket_seconds, aggregation
+        ),
+        zip(bounds[:-1], bounds[1:])
+    ))
+    keys = np.concatenate([part[0] for part in parts])
+    partials = np.concatenate([part[1] for part in parts])
+    counts = np.concatenate([part[2] for part in parts])
+
+    order = np.argsort(keys, kind='stable')
+    keys, partials, counts = keys[order], partials[order], counts[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    merged = _MERGE_FNS[aggregation](partials, starts)
+    if aggregation == 'avg':
+        quotient = np.abs(merged) // np.add.reduceat(counts, starts)
+        merged = np.where(merged < 0, -quotient, quotient)
+    return keys[starts], merged.astype(np.int64, copy=False)
+
+def apply(
+    values: np.ndarray,
+    timestamps: np.ndarray,
+    aggregation: str,
+    bucket_seconds: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Aggregate a non-empty metric stream, optionally per time bucket.
+
+    Args:
+        values: Metric values, int32 or int64; sums are accumulated in int64
+        timestamps: Metric timestamps, in seconds
+        aggregation: Aggregation type ('sum', 'avg', 'min', 'max')
+        bucket_seconds: Bucket width in seconds, or None to aggregate the
+            whole stream into one metric stamped with the first timestamp
+
+    Returns:
+        Tuple of (timestamps, aggregated values), sorted by bucket when grouping
+    """
+    if values.dtype != np.int64 and aggregation in ('sum', 'avg'):
+        values = values.astype(np.int64)
+    if bucket_seconds is None:
+        result = AGG_FNS[aggregation](values, _WHOLE_STREAM)
+        return timestamps[:1].copy(), result.astype(np.int64, copy=False)
+
+    if group_by_bucket_i64 is not None:
+        timestamps = np.ascontiguousarray(timestamps, dtype=np.int64)
+        if bucket_seconds in BUCKETIZERS:
+            buckets = BUCKETIZERS[bucket_seconds](timestamps)
+        else:
+            buckets = bucketize(timestamps, bucket_seconds)
+        kernel = group_by_bucket_i64_parallel if len(values) >= PARALLEL_MIN_ROWS else group_by_bucket_i64
+        return kernel(
+            buckets,
+            np.ascontiguousarray(values, dtype=values.dtype if values.dtype == np.int32 else np.int64),
+            AGGREGATION_CODES[aggregation]
+        )
+    if GROUPING_THREADS > 1 and len(values) >= PARALLEL_MIN_ROWS:
+        return _group_chunked(values, timestamps, aggregation, bucket_seconds)
+    keys, values, starts = _bucket_segments(timestamps, values, bucket_seconds)
+    return keys, AGG_FNS[aggregation](values, starts).astype(np.int64, copy=False)
+
+def warmup() -> None:
+    """
+    Run every kernel once on a tiny stream.
+
+    With Numba the kernels are compiled at import, but the first call still
+    loads the cached machine code and starts the parallel threading layer.
+    Calling this at startup moves that cost out of the first request.
+    """
+    timestamps = np.zeros(1, dtype=np.int64)
+    for dtype in (np.int32, np.int64):
+        values = np.zeros(1, dtype=dtype)
+        for aggregation, code in AGGREGATION_CODES.items():
+            apply(values, timestamps, aggregation)
+            for bucket_seconds in (60, 3600, 86400):
+                apply(values, timestamps, aggregation, bucket_seconds)
+            if group_by_bucket_i64_parallel is not None:
+                group_by_bucket_i64_parallel(timestamps, values, code)
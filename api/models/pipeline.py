@@ -0,0 +1,454 @@
+"""
+Column-oriented transformation pipeline for the in-memory metric stores.
+"""
+from typing import Dict, List, Optional, Sequence, Union
+import numpy as np
+from models.kernels import apply
+
+# Comparison used by each filter type
+FILTER_OPS = {
+    'gt': np.greater,
+    'lt': np.less,
+    'ge': np.greater_equal,
+    'le': np.less_equal,
+    'eq': np.equal,
+}
+
+# Bucket width in seconds for each time grouping
+TIME_GROUPING_SECONDS = {
+    'minute': 60,
+    'hour': 3600,
+    'day': 86400,
+}
+
+AGGREGATION_TYPES = ('sum', 'avg', 'min', 'max')
+
+# Label code used for rows that no longer carry a label (e.g. time groups)
+NO_LABEL = -1
+
+# Upper bound on the label filter masks cached per store snapshot
+MAX_CACHED_LABEL_MASKS = 128
+
+class ColumnarPipeline:
+    """
+    Fluent pipeline that evaluates transformations over column arrays.
+
+    The pipeline works directly on the NumPy columns of a metric store rather
+    than on Metric objects, and mirrors the semantics of the Rust
+    MetricPipeline: filters compare metric values, aggregations collapse the
+    stream into a single metric, and time groupings aggregate per time bucket.
+    Filters only narrow a selection vector; rows are gathered when a later
+    step needs them.
+
+    Example:
+        pipeline = ColumnarPipeline(store.values, store.timestamps,
+                                    store.label_codes, store.labels_dict)
+        result = pipeline.filter_by_label('label_eq', 'cpu').sum().execute_to_dicts()
+    """
+
+    def __init__(
+        self,
+        values: np.ndarray,
+        timestamps: np.ndarray,
+        label_codes: Optional[np.ndarray] = None,
+        labels_dict: Optional[Sequence[str]] = None,
+        label_masks: Optional[Dict] = None
+    ):
+        """
+        Initialize a pipeline over the given columns.
+
+        Args:
+            values: Metric values
+            timestamps: Metric timestamps, in seconds
+            label_codes: Dictionary codes of the metric labels, if any
+            labels_dict: Labels indexed by their code
+            label_masks: Cache of label filter masks over these columns,
+                shared by pipelines built on the same snapshot
+        """
+        if label_codes is None:
+            label_codes = np.full(len(values), NO_LABEL, dtype=np.int32)
+        self._values = values
+        self._timestamps = timestamps
+        self._label_codes = label_codes
+        self._labels_dict = labels_dict if labels_dict is not None else ()
+        self._label_to_code: Optional[Dict[str, int]] = None
+        self._label_masks = label_masks
+        # Selection vector over the current columns, applied lazily
+        self._mask: Optional[np.ndarray] = None
+        self._scratch: Optional[np.ndarray] = None
+
+    def _code_of(self, label: str) -> Optional[int]:
+        """Return the code of a label, or None if no metric carries it"""
+        if self._label_to_code is None:
+            self._label_to_code = {label: code for code, label in enumerate(self._labels_dict)}
+        return self._label_to_code.get(label)
+
+    def _select(self, mask: np.ndarray) -> 'ColumnarPipeline':
+        """Keep only the rows selected by a boolean mask"""
+        if self._mask is None:
+            self._mask = mask
+        elif self._mask.flags.writeable:
+            np.logical_and(self._mask, mask, out=self._mask)
+        else:
+            # The selection is still a shared cached mask; never write into it
+            self._mask = np.logical_and(self._mask, mask)
+        return self
+
+    def _select_where(self, op: np.ufunc, column: np.ndarray, operand: int) -> 'ColumnarPipeline':
+        """Keep only the rows where op(column, operand) holds, reusing buffers"""
+        if self._mask is None or not self._mask.flags.writeable:
+            return self._select(op(column, operand))
+        if self._scratch is None:
+            self._scratch = np.empty(len(column), dtype=bool)
+        op(column, operand, out=self._scratch)
+        np.logical_and(self._mask, self._scratch, out=self._mask)
+        return self
+
+    def _materialize(self) -> None:
+        """Apply the pending selection to the columns"""
+        # Cached masks describe the columns as they were before this point
+        self._label_masks = None
+        if self._mask is None:
+            return
+        mask = self._mask
+        self._values = self._values[mask]
+        self._timestamps = self._timestamps[mask]
+        self._label_codes = self._label_codes[mask]
+        self._mask = None
+        self._scratch = None
+
+    def filter(self, type: str, value: int) -> 'ColumnarPipeline':
+        """
+        Keep metrics whose value satisfies a comparison.
+
+        Args:
+            type: Filter type ('gt', 'lt', 'ge', 'le', 'eq')
+            value: Value to compare against
+
+        Returns:
+            Self for method chaining
+        """
+        op = FILTER_OPS.get(type)
+        if op is None:
+            raise ValueError(f"Invalid filter type. Expected one of: {', '.join(FILTER_OPS)}")
+        return self._select_where(op, self._values, int(value))
+
+    def greater_than(self, value: int) -> 'ColumnarPipeline':
+        """Add a greater than filter"""
+        return self.filter('gt', value)
+
+    def less_than(self, value: int) -> 'ColumnarPipeline':
+        """Add a less than filter"""
+        return self.filter('lt', value)
+
+    def greater_than_or_equal(self, value: int) -> 'ColumnarPipeline':
+        """Add a greater than or equal filter"""
+        return self.filter('ge', value)
+
+    def less_than_or_equal(self, value: int) -> 'ColumnarPipeline':
+        """Add a less than or equal filter"""
+        return self.filter('le', value)
+
+    def equal_to(self, value: int) -> 'ColumnarPipeline':
+        """Add an equality filter"""
+        return self.filter('eq', value)
+
+    def filter_by_label(self, filter_type: str, label: str) -> 'ColumnarPipeline':
+        """
+        Keep metrics with the given label.
+
+        Args:
+            filter_type: Label filter type, must be 'label_eq'
+            label: Label to match
+
+        Returns:
+            Self for method chaining
+        """
+        if filter_type != 'label_eq':
+            raise ValueError(f"Invalid label filter type: {filter_type}. Expected 'label_eq'")
+        code = self._code_of(label)
+        if code is None:
+            return self._select(np.zeros(len(self._values), dtype=bool))
+        return self.filter_by_label_codes(code)
+
+    def filter_by_labels(self, filter_type: str, labels: List[str]) -> 'ColumnarPipeline':
+        """
+        Keep metrics whose label is one of the given labels.
+
+        Args:
+            filter_type: Label filter type, must be 'label_in'
+            labels: Labels to match
+
+        Returns:
+            Self for method chaining
+        """
+        if filter_type != 'label_in':
+            raise ValueError(f"Invalid label filter type: {filter_type}. Expected 'label_in'")
+        codes = np.fromiter(
+            (code for code in map(self._code_of, labels) if code is not None),
+            dtype=np.int32
+        )
+        return self.filter_by_label_codes(codes)
+
+    def filter_by_label_codes(self, codes: Union[int, np.ndarray]) -> 'ColumnarPipeline':
+        """
+        Keep metrics whose label code matches.
+
+        Args:
+            codes: A single label code, or an array of codes to match any of
+
+        Returns:
+            Self for method chaining
+        """
+        if self._label_masks is not None:
+            return self._select(self._cached_label_mask(codes))
+        if isinstance(codes, np.ndarray):
+            return self._select(np.isin(self._label_codes, codes))
+        return self._select_where(np.equal, self._label_codes, codes)
+
+    def _cached_label_mask(self, codes: Union[int, np.ndarray]) -> np.ndarray:
+        """Return the read-only mask for a label filter, computing it at most once per snapshot"""
+        key = tuple(codes.tolist()) if isinstance(codes, np.ndarray) else int(codes)
+        mask = self._label_masks.get(key)
+        if mask is None:
+            if isinstance(codes, np.ndarray):
+                mask = np.isin(self._label_codes, codes)
+            else:
+                mask = self._label_codes == codes
+            mask.flags.writeable = False
+            if len(self._label_masks) < MAX_CACHED_LABEL_MASKS:
+                self._label_masks[key] = mask
+        return mask
+
+    def aggregate(self, type: str) -> 'ColumnarPipeline':
+        """
+        Collapse the metrics into a single aggregated metric.
+
+        The result keeps the timestamp and label of the first metric.
+
+        Args:
+            type: Aggregation type ('sum', 'avg', 'min', 'max')
+
+        Returns:
+            Self for method chaining
+        """
+        if type not in AGGREGATION_TYPES:
+            raise ValueError(f"Unknown aggregation type: {type}")
+        self._materialize()
+        if len(self._values) == 0:
+            raise ValueError("Operation on empty metric stream")
+
+        self._timestamps, self._values = apply(self._values, self._timestamps, type)
+        self._label_codes = self._label_codes[:1].copy()
+        return self
+
+    def sum(self) -> 'ColumnarPipeline':
+        """Add a sum aggregation"""
+        return self.aggregate('sum')
+
+    def average(self) -> 'ColumnarPipeline':
+        """Add an average aggregation"""
+        return self.aggregate('avg')
+
+    def minimum(self) -> 'ColumnarPipeline':
+        """Add a minimum aggregation"""
+        return self.aggregate('min')
+
+    def maximum(self) -> 'ColumnarPipeline':
+        """Add a maximum aggregation"""
+        return self.aggregate('max')
+
+    def group_by(self, time_grouping: str, aggregation: str) -> 'ColumnarPipeline':
+        """
+        Group metrics by time bucket and aggregate each bucket.
+
+        Args:
+            time_grouping: Time grouping type ('hour', 'minute', 'day')
+            aggregation: Aggregation type ('sum', 'avg', 'min', 'max')
+
+        Returns:
+            Self for method chaining
+        """
+        seconds = TIME_GROUPING_SECONDS.get(time_grouping)
+        if seconds is None:
+            raise ValueError(f"Unknown time grouping type: {time_grouping}")
+        if aggregation not in AGGREGATION_TYPES:
+            raise ValueError(f"Unknown aggregation type: {aggregation}")
+        self._materialize()
+        if len(self._values) == 0:
+            raise ValueError("Operation on empty metric stream")
+
+        self._timestamps, self._values = apply(
+            self._values, self._timestamps, aggregation, seconds
+        )
+        self._label_codes = np.full(len(self._values), NO_LABEL, dtype=np.int32)
+        return self
+
+    def group_by_time(self, time_grouping: str, aggregation: str) -> 'ColumnarPipeline':
+        """Alias of group_by, matching the Rust MetricPipeline API"""
+        return self.group_by(time_grouping, aggregation)
+
+    def group_by_minute(self, aggregation: str = 'sum') -> 'ColumnarPipeline':
+        """Group by minute with the given aggregation"""
+        return self.group_by('minute', aggregation)
+
+    def group_by_hour(self, aggregation: str = 'sum') -> 'ColumnarPipeline':
+        """Group by hour with the given aggregation"""
+        return self.group_by('hour', aggregation)
+
+    def group_by_day(self, aggregation: str = 'sum') -> 'ColumnarPipeline':
+        """Group by day with the given aggregation"""
+        return self.group_by('day', aggregation)
+
+    def execute_to_dicts(self) -> List[Dict]:
+        """
+        Return the transformed metrics as dictionaries.
+
+        Returns:
+            List of dictionaries with value, timestamp, and label when present
+        """
+        self._materialize()
+        labels = self._labels_dict
+        return [
+            {
+                'value': value,
+                'timestamp': timestamp,
+                **({'label': labels[code]} if code != NO_LABEL else {})
+            }
+            for value, timestamp, code in zip(
+                self._values.tolist(), self._timestamps.tolist(), self._label_codes.tolist()
+            )
+        ]
+
+def create_labeled_pipeline(store) -> ColumnarPipeline:
+    """
+    Create a pipeline over the columns of a LabeledMetricStore.
+
+    Args:
+        store: LabeledMetricStore to read from
+
+    Returns:
+        A new ColumnarPipeline
+    """
+    return ColumnarPipeline(*store.view())
+
+# Operations that only select rows, and can be fused into a single mask
+FILTER_STEPS = {
+    'filter', 'greater_than', 'less_than', 'greater_than_or_equal',
+    'less_than_or_equal', 'equal_to', 'filter_by_label_codes',
+}
+
+# Operations that collapse or regroup the metric stream
+AGGREGATION_STEPS = {
+    'aggregate', 'sum', 'average', 'minimum', 'maximum',
+    'group_by', 'group_by_time', 'group_by_minute', 'group_by_hour', 'group_by_day',
+}
+
+def _check_step(op: str, args: Dict) -> None:
+    """Validate the arguments of a planned step, raising ValueError if invalid"""
+    if op == 'filter' and args.get('type') not in FILTER_OPS:
+        raise ValueError(f"Invalid filter type. Expected one of: {', '.join(FILTER_OPS)}")
+    if op == 'aggregate' and args.get('type') not in AGGREGATION_TYPES:
+        raise ValueError(f"Unknown aggregation type: {args.get('type')}")
+    if op in ('group_by', 'group_by_time') and args.get('time_grouping') not in TIME_GROUPING_SECONDS:
+        raise ValueError(f"Unknown time grouping type: {args.get('time_grouping')}")
+    if op.startswith('group_by') and args.get('aggregation', 'sum') not in AGGREGATION_TYPES:
+        raise ValueError(f"Unknown aggregation type: {args.get('aggregation')}")
+
+class PlannedPipeline:
+    """
+    Pipeline that records its steps and evaluates them in one pass.
+
+    Steps are validated as they are planned but nothing is computed until
+    run() is called. At that point every filter ahead of the first
+    aggregation is ANDed in place into a single selection vector, the
+    columns are gathered once, and the first aggregation runs over the
+    selected rows. Any remaining steps operate on the (small) aggregated
+    result.
+
+    Example:
+        pipeline = PlannedPipeline(store.values, store.timestamps,
+                                   store.label_codes, store.labels_dict)
+        pipeline.plan('filter_by_label_codes', codes=3).plan('greater_than', value=10)
+        result = pipeline.plan('group_by_hour', aggregation='avg').run()
+    """
+
+    def __init__(
+        self,
+        values: np.ndarray,
+        timestamps: np.ndarray,
+        label_codes: Optional[np.ndarray] = None,
+        labels_dict: Optional[Sequence[str]] = None,
+        label_masks: Optional[Dict] = None
+    ):
+        """
+        Initialize a pipeline over the given columns.
+
+        Args:
+            values: Metric values
+            timestamps: Metric timestamps, in seconds
+            label_codes: Dictionary codes of the metric labels, if any
+            labels_dict: Labels indexed by their code
+            label_masks: Cache of label filter masks over these columns,
+                shared by pipelines built on the same snapshot
+        """
+        if label_codes is None:
+            label_codes = np.full(len(values), NO_LABEL, dtype=np.int32)
+        self._values = values
+        self._timestamps = timestamps
+        self._label_codes = label_codes
+        self._labels_dict = labels_dict
+        self._label_masks = label_masks
+        self._steps: List[tuple] = []
+
+    def plan(self, op: str, **args) -> 'PlannedPipeline':
+        """
+        Record a pipeline step.
+
+        Args:
+            op: Name of a ColumnarPipeline operation
+            **args: Keyword arguments for the operation
+
+        Returns:
+            Self for method chaining
+
+        Raises:
+            ValueError: If the operation or its arguments are invalid
+        """
+        if op not in FILTER_STEPS and op not in AGGREGATION_STEPS:
+            raise ValueError(f"Unknown operation: {op}")
+        _check_step(op, args)
+        self._steps.append((op, args))
+        return self
+
+    def run(self) -> List[Dict]:
+        """
+        Evaluate the planned steps.
+
+        Returns:
+            List of dictionaries with value, timestamp, and label when present
+
+        Raises:
+            ValueError: If an aggregation is applied to an empty metric stream
+        """
+        # Filters only narrow the pipeline's selection vector, so every filter
+        # ahead of an aggregation is evaluated in place into one mask and the
+        # columns are gathered once, when the aggregation needs the rows.
+        pipeline = ColumnarPipeline(
+            self._values, self._timestamps, self._label_codes, self._labels_dict, self._label_masks
+        )
+        for op, args in self._steps:
+            getattr(pipeline, op)(**args)
+        return pipeline.execute_to_dicts()
+
+def create_planned_pipeline(store) -> PlannedPipeline:
+    """
+    Create a planned pipeline over the columns of a LabeledMetricStore.
+
+    Args:
+        store: LabeledMetricStore to read from
+
+    Returns:
+        A new PlannedPipeline
+    """
+    return PlannedPipeline(*store.view())
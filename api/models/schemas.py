@@ -0,0 +1,126 @@
+"""
+Request schemas shared by the metrics endpoints.
+
+The models are built once at import time; pydantic compiles each into a
+specialized validator, so a request body is checked in a single pass.
+"""
+from time import time_ns
+from typing import Annotated, Any, List, Literal, Optional, Union
+from pydantic import (
+    BaseModel, Field, StrictInt, StrictStr, ValidationError, field_validator, model_validator
+)
+
+# Integer that fits the int64 columns metrics are stored in
+Int64 = Annotated[StrictInt, Field(ge=-2**63, le=2**63 - 1)]
+
+class MetricInput(BaseModel):
+    """Request body for adding a single metric"""
+    value: Int64
+    timestamp: Optional[Int64] = None
+
+    @field_validator('timestamp')
+    @classmethod
+    def _check_timestamp(cls, timestamp: Optional[int]) -> Optional[int]:
+        if timestamp is not None:
+            if timestamp < 0:
+                raise ValueError("Timestamp must be after Linux epoch (0)")
+            if timestamp > time_ns() // 1_000_000_000:
+                raise ValueError("Timestamp cannot be in the future")
+        return timestamp
+
+class LabeledMetricInput(MetricInput):
+    """Request body for adding a single labeled metric"""
+    label: StrictStr
+
+    @field_validator('label')
+    @classmethod
+    def _check_label(cls, label: str) -> str:
+        if not label.strip():
+            raise ValueError("Label cannot be empty")
+        return label
+
+# Message reported when a metric field has the wrong type
+_METRIC_TYPE_ERRORS = {
+    'value': "Value must be an integer",
+    'timestamp': "Timestamp must be an integer",
+    'label': "Label must be a string",
+}
+
+def metric_error_message(error: ValidationError) -> str:
+    """Turn the first metric validation error into a readable message"""
+    details = error.errors()[0]
+    if not details['loc']:
+        return f"Invalid request body: {details['msg']}"
+
+    field = details['loc'][0]
+    if details['type'] == 'missing':
+        return f"Missing required field: {field}"
+    if details['type'] == 'value_error':
+        return str(details['ctx']['error'])
+    if details['type'] in ('greater_than_equal', 'less_than_equal'):
+        return f"{str(field).capitalize()} must fit in a 64-bit signed integer"
+    return _METRIC_TYPE_ERRORS.get(field, details['msg'])
+
+class ValueFilter(BaseModel):
+    """Comparison applied to metric values"""
+    type: Literal['gt', 'lt', 'ge', 'le', 'eq']
+    value: StrictInt
+
+class Transformation(BaseModel):
+    """A single entry of a transformations request"""
+    filter: Optional[ValueFilter] = None
+    aggregation: Optional[Literal['sum', 'avg', 'min', 'max']] = None
+    time_grouping: Optional[Literal['hour', 'minute', 'day']] = None
+    label_filter: Optional[Union[StrictStr, List[StrictStr]]] = None
+
+    @field_validator('label_filter', mode='before')
+    @classmethod
+    def _check_label_filter(cls, label_filter: Any) -> Any:
+        if type(label_filter) is str:
+            if not label_filter.strip():
+                raise ValueError("Label value cannot be empty")
+        elif type(label_filter) is list:
+            if not label_filter:
+                raise ValueError("Label value list cannot be empty")
+            if not all(type(label) is str and label.strip() for label in label_filter):
+                raise ValueError("All labels in the list must be non-empty strings")
+        elif label_filter is not None:
+            raise ValueError("Label filter must be a string or list of strings")
+        return label_filter
+
+    @model_validator(mode='after')
+    def _check_operations(self) -> 'Transformation':
+        if self.filter is None and self.aggregation is None and self.time_grouping is None \
+                and self.label_filter is None:
+            raise ValueError(
+                "Transformation must include at least one operation "
+                "(filter, aggregation, time_grouping, or label_filter)"
+            )
+        if self.time_grouping is not None and self.aggregation is None:
+            raise ValueError("Time grouping requires an aggregation to be specified")
+        return self
+
+class TransformationsRequest(BaseModel):
+    """Request body for the transform endpoints"""
+    transformations: Annotated[List[Transformation], Field(min_length=1)]
+
+def transformations_error_message(error: ValidationError) -> str:
+    """Turn the first transformations validation error into a readable message"""
+    details = error.errors()[0]
+    loc = details['loc']
+    if details['type'] == 'value_error':
+        message = str(details['ctx']['error'])
+    else:
+        message = details['msg']
+
+    if not loc:
+        return f"Invalid request body: {message}"
+    if details['type'] == 'missing' and len(loc) == 1:
+        return f"Missing required field: {loc[0]}"
+    if len(loc) < 2:
+        return f"Invalid {loc[0]}: {message}"
+
+    field = '.'.join(str(part) for part in loc[2:4])
+    if field:
+        return f"Invalid transformation at index {loc[1]}: {field}: {message}"
+    return f"Invalid transformation at index {loc[1]}: {message}"
@@ -1,21 +1,440 @@
 """
 Storage for metrics data.
 """
-from typing import List
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Union
 import os
+import numpy as np
 from metric_query_simplified import Metric, LabeledMetric
-from utils.utils import load_test_data
+from utils.utils import load_test_columns
+
+_INT32 = np.iinfo(np.int32)
+
+def _needs_int64(values: np.ndarray) -> bool:
+    """Whether a value column holds values outside the int32 range"""
+    return (
+        len(values) > 0
+        and values.dtype != np.int32
+        and (values.min() < _INT32.min or values.max() > _INT32.max)
+    )
+
+class ColumnView(NamedTuple):
+    """Read-only snapshot of the columns of a LabeledMetricStore"""
+    values: np.ndarray
+    timestamps: np.ndarray
+    label_codes: np.ndarray
+    labels_dict: Sequence[str]
+    # Label filter masks computed over this snapshot, keyed by label code(s)
+    label_masks: Dict
+
+class LabeledMetricStore:
+    """
+    Column-oriented storage for labeled metrics.
+
+    Values, timestamps and labels are kept in parallel NumPy arrays instead of
+    a list of LabeledMetric objects. Labels are dictionary-encoded: each
+    distinct label is stored once in labels_dict and rows only hold its
+    integer code. The arrays grow geometrically so appends are amortized O(1).
+
+    Values are held as int32 until a value outside that range is stored, at
+    which point the column is promoted to int64 for good. Halving the column
+    halves the bytes scanned by filters and aggregations.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        """
+        Initialize an empty store.
+
+        Args:
+            capacity: Number of rows to preallocate
+        """
+        self._values = np.empty(capacity, dtype=np.int32)
+        self._timestamps = np.empty(capacity, dtype=np.int64)
+        self._label_codes = np.empty(capacity, dtype=np.int32)
+        self.labels_dict: List[str] = []
+        self.label_to_code: Dict[str, int] = {}
+        self.n = 0
+        # Bumped on every append so snapshots can be cached per version
+        self.version = 0
+
+    def __len__(self) -> int:
+        return self.n
+
+    @property
+    def values(self) -> np.ndarray:
+        """Metric values of the stored rows"""
+        return self._values[:self.n]
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Timestamps of the stored rows"""
+        return self._timestamps[:self.n]
+
+    @property
+    def label_codes(self) -> np.ndarray:
+        """Dictionary codes of the stored rows' labels"""
+        return self._label_codes[:self.n]
+
+    def view(self) -> ColumnView:
+        """
+        Return a read-only snapshot of the stored columns.
+
+        The snapshot is built once per store version and shared by every
+        pipeline created until the next append.
+
+        Returns:
+            ColumnView over the current rows
+        """
+        return _base_view(self, self.version)
+
+    def encode_label(self, label: str) -> int:
+        """Return the code for a label, adding it to the dictionary if needed"""
+        code = self.label_to_code.get(label)
+        if code is None:
+            code = len(self.labels_dict)
+            self.labels_dict.append(label)
+            self.label_to_code[label] = code
+        return code
+
+    def encode_filter(self, label_filter: Union[str, List[str]]) -> Union[int, np.ndarray]:
+        """
+        Resolve a label filter to label codes.
+
+        Labels that are not stored are dropped, so a filter on unknown labels
+        resolves to an empty array that matches nothing and the rest of the
+        pipeline runs as it would for a known label matching no metrics.
+
+        Args:
+            label_filter: A single label or a list of labels
+
+        Returns:
+            The code of a single stored label, otherwise an int32 array of the
+            codes of the stored labels
+        """
+        if type(label_filter) is str:
+            code = self.label_to_code.get(label_filter)
+            return code if code is not None else np.empty(0, dtype=np.int32)
+
+        return np.fromiter(
+            (self.label_to_code[label] for label in label_filter if label in self.label_to_code),
+            dtype=np.int32
+        )
+
+    def _reserve(self, extra: int) -> None:
+        """Make sure there is room for `extra` more rows"""
+        needed = self.n + extra
+        capacity = len(self._values)
+        if needed <= capacity:
+            return
+
+        while capacity < needed:
+            capacity = max(capacity * 2, 1)
+
+        self._values = np.resize(self._values, capacity)
+        self._timestamps = np.resize(self._timestamps, capacity)
+        self._label_codes = np.resize(self._label_codes, capacity)
+
+    def _widen_values(self) -> None:
+        """Promote the value column to int64"""
+        self._values = self._values.astype(np.int64)
+
+    def append(self, metric: LabeledMetric) -> int:
+        """
+        Append a labeled metric.
+
+        Args:
+            metric: LabeledMetric (or any object with label, value and timestamp)
+
+        Returns:
+            Index of the new row
+        """
+        return self.append_raw(self.encode_label(metric.label), metric.value, metric.timestamp)
+
+    def append_raw(self, label_code: int, value: int, timestamp: int) -> int:
+        """
+        Append a row straight into the columns.
+
+        Args:
+            label_code: Code of the row's label, as returned by encode_label
+            value: Metric value
+            timestamp: Metric timestamp, in seconds
+
+        Returns:
+            Index of the new row
+        """
+        if self._values.dtype == np.int32 and not _INT32.min <= value <= _INT32.max:
+            self._widen_values()
+        self._reserve(1)
+        index = self.n
+        self._values[index] = value
+        self._timestamps[index] = timestamp
+        self._label_codes[index] = label_code
+        self.n += 1
+        self.version += 1
+        return index
+
+    def extend(self, metrics: Iterable[LabeledMetric]) -> None:
+        """Append several labeled metrics"""
+        for metric in metrics:
+            self.append(metric)
+
+    def encode_labels(self, labels: Sequence[str]) -> np.ndarray:
+        """
+        Encode a column of labels, adding new labels to the dictionary.
+
+        Args:
+            labels: Label of each row
+
+        Returns:
+            int32 array with the code of each row's label
+        """
+        if not len(labels):
+            return np.empty(0, dtype=np.int32)
+        distinct, inverse = np.unique(np.asarray(labels, dtype=str), return_inverse=True)
+        codes = np.array([self.encode_label(label) for label in distinct.tolist()], dtype=np.int32)
+        return codes[inverse.reshape(-1)]
+
+    def extend_columns(self, values: np.ndarray, timestamps: np.ndarray, label_codes: np.ndarray) -> int:
+        """
+        Append rows given as columns.
+
+        Args:
+            values: Metric values
+            timestamps: Metric timestamps, in seconds
+            label_codes: Codes of the metric labels, which must already be in labels_dict
+
+        Returns:
+            Index of the first new row
+
+        Raises:
+            ValueError: If the columns differ in length or a label code is unknown
+        """
+        count = len(values)
+        if len(timestamps) != count or len(label_codes) != count:
+            raise ValueError("values, timestamps and label codes must have the same length")
+        if count and (label_codes.min() < 0 or label_codes.max() >= len(self.labels_dict)):
+            raise ValueError("Unknown label code")
+
+        if self._values.dtype == np.int32 and _needs_int64(values):
+            self._widen_values()
+        self._reserve(count)
+        start = self.n
+        self._values[start:start + count] = values
+        self._timestamps[start:start + count] = timestamps
+        self._label_codes[start:start + count] = label_codes
+        self.n += count
+        self.version += 1
+        return start
+
+    def iter_dicts(self, chunk_size: int = 1000) -> Iterator[List[Dict]]:
+        """
+        Convert the stored rows to dictionaries, a chunk at a time.
+
+        Rows appended after the iteration starts are not included.
+
+        Args:
+            chunk_size: Number of rows per chunk
+
+        Yields:
+            Lists of dictionaries with label, value, and timestamp
+        """
+        view = self.view()
+        labels_dict = view.labels_dict
+        for start in range(0, len(view.values), chunk_size):
+            stop = start + chunk_size
+            labels = [labels_dict[code] for code in view.label_codes[start:stop].tolist()]
+            yield [
+                {'label': label, 'value': value, 'timestamp': timestamp}
+                for label, value, timestamp in zip(
+                    labels, view.values[start:stop].tolist(), view.timestamps[start:stop].tolist()
+                )
+            ]
+
+    def to_dicts(self) -> List[Dict]:
+        """
+        Convert the stored rows to dictionaries.
+
+        Returns:
+            List of dictionaries with label, value, and timestamp
+        """
+        labels_dict = self.labels_dict
+        labels = [labels_dict[code] for code in self.label_codes.tolist()]
+        return [
+            {'label': label, 'value': value, 'timestamp': timestamp}
+            for label, value, timestamp in zip(labels, self.values.tolist(), self.timestamps.tolist())
+        ]
+
+class MetricStore(list):
+    """
+    List of Metric objects with parallel NumPy columns.
+
+    The list itself is what the Rust pipeline consumes. The values and
+    timestamps columns shadow it for code that works on whole columns; they
+    are brought up to date lazily, converting only the metrics appended since
+    the last access, so the store must only ever be appended to. Like in
+    LabeledMetricStore, values stay int32 until one does not fit.
+    """
+
+    def __init__(self, metrics: Iterable[Metric] = ()):
+        super().__init__(metrics)
+        self._values = np.empty(0, dtype=np.int32)
+        self._timestamps = np.empty(0, dtype=np.int64)
+        self._synced = 0
+        # Bumped on every append so responses can be validated per version
+        self.version = 0
+        # Timestamp order of the first _indexed metrics, rebuilt after appends
+        self._sorted_timestamps = np.empty(0, dtype=np.int64)
+        self._time_order = np.empty(0, dtype=np.intp)
+        self._indexed = 0
+
+    def _sync(self) -> None:
+        """Copy metrics that are not in the columns yet into them"""
+        n = len(self)
+        if n == self._synced:
+            return
+        if n < self._synced:
+            # Metrics were removed; rebuild the columns from scratch
+            self._synced = 0
+
+        new = self[self._synced:]
+        capacity = len(self._values)
+        if n > capacity:
+            capacity = max(capacity * 2, n, 1024)
+            self._values = np.resize(self._values, capacity)
+            self._timestamps = np.resize(self._timestamps, capacity)
+        values = np.fromiter((m.value for m in new), dtype=np.int64, count=len(new))
+        if self._values.dtype == np.int32 and _needs_int64(values):
+            self._values = self._values.astype(np.int64)
+        self._values[self._synced:n] = values
+        self._timestamps[self._synced:n] = np.fromiter((m.timestamp for m in new), dtype=np.int64, count=len(new))
+        self._synced = n
+
+    def append(self, metric: Metric) -> None:
+        """Append a metric"""
+        super().append(metric)
+        self.version += 1
+
+    def extend(self, metrics: Iterable[Metric]) -> None:
+        """Append several metrics"""
+        super().extend(metrics)
+        self.version += 1
+
+    @property
+    def values(self) -> np.ndarray:
+        """Metric values, in insertion order"""
+        self._sync()
+        return self._values[:self._synced]
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Metric timestamps, in insertion order"""
+        self._sync()
+        return self._timestamps[:self._synced]
+
+    def extend_columns(self, values: np.ndarray, timestamps: np.ndarray) -> int:
+        """
+        Append metrics given as columns.
+
+        The columns are copied in directly instead of being rebuilt from the
+        new Metric objects.
+
+        Args:
+            values: Metric values
+            timestamps: Metric timestamps, in seconds
+
+        Returns:
+            Index of the first new metric
+
+        Raises:
+            ValueError: If the columns differ in length
+        """
+        count = len(values)
+        if len(timestamps) != count:
+            raise ValueError("values and timestamps must have the same length")
+
+        self._sync()
+        start = len(self)
+        super().extend(
+            Metric(value=value, timestamp=timestamp)
+            for value, timestamp in zip(values.tolist(), timestamps.tolist())
+        )
+        if self._values.dtype == np.int32 and not _needs_int64(values):
+            values = values.astype(np.int32)
+        self._values = np.concatenate([self._values[:start], values])
+        self._timestamps = np.concatenate([self._timestamps[:start], timestamps.astype(np.int64, copy=False)])
+        self._synced = start + count
+        self.version += 1
+        return start
+
+    def _time_index(self):
+        """Return the timestamps in sorted order and the permutation that sorts them"""
+        timestamps = self.timestamps
+        if self._indexed != len(timestamps):
+            # Metrics mostly arrive in time order, which the stable sort handles quickly
+            self._time_order = np.argsort(timestamps, kind='stable')
+            self._sorted_timestamps = timestamps[self._time_order]
+            self._indexed = len(timestamps)
+        return self._sorted_timestamps, self._time_order
+
+    def since(self, timestamp: int) -> np.ndarray:
+        """
+        Find the metrics recorded at or after a point in time.
+
+        Uses a binary search over a timestamp index that is kept until the
+        next append, instead of scanning every metric.
+
+        Args:
+            timestamp: Earliest timestamp to include, in seconds
+
+        Returns:
+            Indices of the matching metrics, in insertion order
+        """
+        sorted_timestamps, order = self._time_index()
+        start = np.searchsorted(sorted_timestamps, timestamp, side='left')
+        return np.sort(order[start:])
+
+    def to_dicts(self, indices: Optional[np.ndarray] = None) -> List[Dict]:
+        """
+        Convert the stored metrics to dictionaries.
+
+        Args:
+            indices: Indices of the metrics to convert, or None for all of them
+
+        Returns:
+            List of dictionaries with value and timestamp
+        """
+        values, timestamps = self.values, self.timestamps
+        if indices is not None:
+            values, timestamps = values[indices], timestamps[indices]
+        return [
+            {'value': value, 'timestamp': timestamp}
+            for value, timestamp in zip(values.tolist(), timestamps.tolist())
+        ]
+
+@lru_cache(maxsize=1)
+def _base_view(store: LabeledMetricStore, version: int) -> ColumnView:
+    """Build the column snapshot of a store at a given version"""
+    columns = []
+    for column in (store.values, store.timestamps, store.label_codes):
+        column = column.view()
+        column.flags.writeable = False
+        columns.append(column)
+    return ColumnView(*columns, tuple(store.labels_dict), {})
 
 # In-memory storage for metrics
-metrics_store: List[Metric] = []
-labeled_metrics_store: List[LabeledMetric] = []
+metrics_store = MetricStore()
+labeled_metrics_store = LabeledMetricStore()
 
 # Load initial test data
 try:
     print("Loading test data...")
-    test_data = load_test_data()
-    metrics_store.extend(test_data["metrics"])
-    labeled_metrics_store.extend(test_data["labeled_metrics"])
+    test_data = load_test_columns()
+    metrics_store.extend_columns(test_data["values"], test_data["timestamps"])
+    labeled_metrics_store.extend_columns(
+        test_data["labeled_values"],
+        test_data["labeled_timestamps"],
+        labeled_metrics_store.encode_labels(test_data["labeled_labels"])
+    )
     print(f"Loaded {len(metrics_store)} metrics and {len(labeled_metrics_store)} labeled metrics")
 except Exception as e:
-    print(f"Error loading test data: {e}")
\ No newline at end of file
+    print(f"Error loading test data: {e}")
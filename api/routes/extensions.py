@@ -1,11 +1,57 @@
 """
 Endpoints for extending the API with custom plugins.
 """
-from flask import jsonify, Blueprint, request
+from typing import Any, Dict
+from flask import Blueprint, request
+from pydantic import BaseModel, ValidationError
+from utils.utils import dumps_json, json_response
 
 # Create a Blueprint for the extensions routes
 extensions_bp = Blueprint('extensions', __name__)
 
+# The registration endpoints currently answer with a constant body, so it is
+# serialized once here rather than on every request
+_FILTER_REGISTRATION_RESPONSE = dumps_json({
+    "status": "success",
+    "message": "Custom filters are supported through the plugin architecture. "
+              "To implement a custom filter, extend the FilterPlugin trait in Rust."
+})
+
+_AGGREGATION_REGISTRATION_RESPONSE = dumps_json({
+    "status": "success",
+    "message": "Custom aggregations are supported through the plugin architecture. "
+              "To implement a custom aggregation, extend the AggregationPlugin trait in Rust."
+})
+
+class PluginRegistration(BaseModel):
+    """Request body for registering a custom filter or aggregation plugin"""
+    name: str
+    description: str = ''
+    parameters: Dict[str, Any] = {}
+    implementation: str = ''
+
+def _validation_error_message(error: ValidationError) -> str:
+    """Turn the first pydantic validation error into a readable message"""
+    details = error.errors()[0]
+    field = '.'.join(str(part) for part in details['loc'])
+    if details['type'] == 'missing':
+        return f"Missing required field: {field}"
+    if not field:
+        return f"Invalid request body: {details['msg']}"
+    return f"Invalid field {field}: {details['msg']}"
+
+def _parse_registration():
+    """
+    Parse and validate a plugin registration request body.
+    
+    Returns:
+        Tuple of (registration, error_response)
+    """
+    try:
+        return PluginRegistration.model_validate_json(request.get_data()), None
+    except ValidationError as e:
+        return None, json_response({"status": "error", "message": _validation_error_message(e)}, 400)
+
 @extensions_bp.route('/transformations/filters', methods=['POST'])
 def register_custom_filter():
     """
@@ -67,13 +113,13 @@ def register_custom_filter():
               type: string
               example: "Missing required field: name"
     """
+    registration, error_response = _parse_registration()
+    if error_response is not None:
+        return error_response
+    
     # In a real implementation, this would dynamically register a plugin
     # For now, we'll return a placeholder response
-    return jsonify({
-        "status": "success",
-        "message": "Custom filters are supported through the plugin architecture. "
-                  "To implement a custom filter, extend the FilterPlugin trait in Rust."
-    }), 200
+    return json_response(_FILTER_REGISTRATION_RESPONSE)
 
 @extensions_bp.route('/transformations/aggregations', methods=['POST'])
 def register_custom_aggregation():
@@ -136,10 +182,10 @@ def register_custom_aggregation():
               type: string
               example: "Missing required field: name"
     """
+    registration, error_response = _parse_registration()
+    if error_response is not None:
+        return error_response
+    
     # In a real implementation, this would dynamically register a plugin
     # For now, we'll return a placeholder response
-    return jsonify({
-        "status": "success",
-        "message": "Custom aggregations are supported through the plugin architecture. "
-                  "To implement a custom aggregation, extend the AggregationPlugin trait in Rust."
-    }), 200
\ No newline at end of file
+    return json_response(_AGGREGATION_REGISTRATION_RESPONSE)
\ No newline at end of file
@@ -1,16 +1,150 @@
 """
 Endpoints for labeled metrics operations.
 """
-from datetime import datetime
-from flask import request, jsonify, Blueprint
-from metric_query_simplified import (
-    LabeledMetric, create_pipeline, validate_labeled_metric, validate_transformations
+from time import time_ns
+from typing import Annotated, Any, List, Literal, Union
+import numpy as np
+from flask import request, Blueprint
+from pydantic import BaseModel, Field, StrictInt, ValidationError
+from models.pipeline import create_planned_pipeline
+from models.schemas import (
+    LabeledMetricInput, TransformationsRequest, metric_error_message, transformations_error_message
 )
 from models.store import labeled_metrics_store
+from utils.utils import (
+    error_response as _err, chunked, json_response, load_json_body, stream_json_array, wants_stream
+)
 
 # Create a Blueprint for the labeled metrics routes
 labeled_metrics_bp = Blueprint('labeled_metrics', __name__)
 
+# Record layout of binary bulk uploads
+BULK_RECORD_DTYPE = np.dtype([('label_code', '<i4'), ('value', '<i8'), ('timestamp', '<i8')])
+
+class FilterByLabelStep(BaseModel):
+    """Keep metrics with a specific label"""
+    operation: Literal['filter_by_label']
+    label: str
+
+class FilterByLabelsStep(BaseModel):
+    """Keep metrics with any of the given labels"""
+    operation: Literal['filter_by_labels']
+    labels: List[str]
+
+class FilterStep(BaseModel):
+    """Keep metrics whose value satisfies a comparison"""
+    operation: Literal['filter']
+    type: str
+    value: StrictInt
+
+class ComparisonStep(BaseModel):
+    """Shorthand value comparisons"""
+    operation: Literal['greater_than', 'less_than', 'equal_to']
+    value: StrictInt
+
+class AggregateStep(BaseModel):
+    """Collapse the metrics with the given aggregation"""
+    operation: Literal['aggregate']
+    type: str
+
+class AggregationShorthandStep(BaseModel):
+    """Shorthand aggregations"""
+    operation: Literal['sum', 'average']
+
+class GroupByStep(BaseModel):
+    """Group metrics by time bucket"""
+    operation: Literal['group_by']
+    time_grouping: str
+    aggregation: str
+
+class GroupByShorthandStep(BaseModel):
+    """Group metrics by a fixed time bucket"""
+    operation: Literal['group_by_minute', 'group_by_hour', 'group_by_day']
+    aggregation: str = 'sum'
+
+PipelineStep = Annotated[
+    Union[
+        FilterByLabelStep, FilterByLabelsStep, FilterStep, ComparisonStep,
+        AggregateStep, AggregationShorthandStep, GroupByStep, GroupByShorthandStep
+    ],
+    Field(discriminator='operation')
+]
+
+class PipelineRequest(BaseModel):
+    """Request body for the labeled metrics pipeline endpoint"""
+    pipeline: List[PipelineStep] = []
+
+def _op_filter_by_label(pipeline, step):
+    """Plan a single label filter"""
+    pipeline.plan('filter_by_label_codes', codes=labeled_metrics_store.encode_filter(step.label))
+
+def _op_filter_by_labels(pipeline, step):
+    """Plan a filter matching any of several labels"""
+    pipeline.plan('filter_by_label_codes', codes=labeled_metrics_store.encode_filter(step.labels))
+
+def _op_filter(pipeline, step):
+    """Plan a value filter"""
+    pipeline.plan('filter', type=step.type, value=step.value)
+
+def _op_comparison(pipeline, step):
+    """Plan a greater_than, less_than or equal_to filter"""
+    pipeline.plan(step.operation, value=step.value)
+
+def _op_aggregate(pipeline, step):
+    """Plan an aggregation"""
+    pipeline.plan('aggregate', type=step.type)
+
+def _op_aggregation_shorthand(pipeline, step):
+    """Plan a sum or average aggregation"""
+    pipeline.plan(step.operation)
+
+def _op_group_by(pipeline, step):
+    """Plan a time grouping"""
+    pipeline.plan('group_by', time_grouping=step.time_grouping, aggregation=step.aggregation)
+
+def _op_group_by_shorthand(pipeline, step):
+    """Plan a minute, hour or day grouping"""
+    pipeline.plan(step.operation, aggregation=step.aggregation)
+
+# Handler for each pipeline operation
+OPS = {
+    'filter_by_label': _op_filter_by_label,
+    'filter_by_labels': _op_filter_by_labels,
+    'filter': _op_filter,
+    'greater_than': _op_comparison,
+    'less_than': _op_comparison,
+    'equal_to': _op_comparison,
+    'aggregate': _op_aggregate,
+    'sum': _op_aggregation_shorthand,
+    'average': _op_aggregation_shorthand,
+    'group_by': _op_group_by,
+    'group_by_minute': _op_group_by_shorthand,
+    'group_by_hour': _op_group_by_shorthand,
+    'group_by_day': _op_group_by_shorthand,
+}
+
+def _pipeline_error_message(error: ValidationError) -> str:
+    """Turn the first pipeline validation error into a readable message"""
+    details = error.errors()[0]
+    loc = details['loc']
+    if not loc or loc[0] != 'pipeline':
+        return f"Invalid request body: {details['msg']}"
+    if len(loc) < 2:
+        return f"Invalid pipeline: {details['msg']}"
+
+    step = loc[1]
+    if details['type'] == 'union_tag_not_found':
+        return f"Missing operation in pipeline step {step}"
+    if details['type'] == 'union_tag_invalid':
+        return f"Unknown operation: {details['input'].get('operation')} (step {step})"
+    if len(loc) < 4:
+        return f"Invalid pipeline step {step}: {details['msg']}"
+
+    operation, field = loc[2], loc[3]
+    if details['type'] == 'missing':
+        return f"{operation} operation requires {field} (step {step})"
+    return f"Invalid {field} for {operation} operation (step {step}): {details['msg']}"
+
 @labeled_metrics_bp.route('/', methods=['GET'])
 def get_labeled_metrics():
     """
@@ -18,6 +152,12 @@ def get_labeled_metrics():
     ---
     tags:
       - Labeled Metrics
+    parameters:
+      - in: query
+        name: stream
+        type: integer
+        required: false
+        description: Set to 1 to stream the result array in chunks instead of buffering it
     responses:
       200:
         description: A list of all labeled metrics
@@ -36,9 +176,10 @@ def get_labeled_metrics():
                 type: integer
                 description: Unix timestamp in seconds
     """
-    # Use to_dicts helper from our improved library
-    result = [{'label': m.label, 'value': m.value, 'timestamp': m.timestamp} for m in labeled_metrics_store]
-    return jsonify(result)
+    if wants_stream():
+        return stream_json_array(labeled_metrics_store.iter_dicts())
+    # Serialize straight from the store columns; json_response uses orjson when available
+    return json_response(labeled_metrics_store.to_dicts())
 
 @labeled_metrics_bp.route('/', methods=['POST'])
 def add_labeled_metric():
@@ -73,22 +214,180 @@ def add_labeled_metric():
       400:
         description: Invalid input
     """
-    data = request.json
+    data = request.get_data()
     
-    # Validate input
-    is_valid, error = validate_labeled_metric(data)
-    if not is_valid:
-        return jsonify({"error": error}), 400
+    if not data:
+        return _err("Empty metric data")
     
-    # Create a new labeled metric
-    metric = LabeledMetric(
-        label=data['label'],
-        value=int(data['value']),
-        timestamp=int(data.get('timestamp', datetime.now().timestamp()))
-    )
+    # Validate input into a typed metric; integer fields must already be integers
+    try:
+        metric_input = LabeledMetricInput.model_validate_json(data)
+    except ValidationError as e:
+        return _err(metric_error_message(e))
     
-    labeled_metrics_store.append(metric)
-    return jsonify({"status": "success", "id": len(labeled_metrics_store) - 1}), 201
+    # Write the metric straight into the store columns
+    timestamp = metric_input.timestamp
+    metric_id = labeled_metrics_store.append_raw(
+        labeled_metrics_store.encode_label(metric_input.label),
+        metric_input.value,
+        timestamp if timestamp is not None else time_ns() // 1_000_000_000
+    )
+    return json_response({"status": "success", "id": metric_id}, 201)
+
+def _check_bulk_timestamps(timestamps: np.ndarray) -> None:
+    """Reject timestamps before the epoch or in the future, like validate_metric"""
+    if len(timestamps) and timestamps.min() < 0:
+        raise ValueError("Timestamp must be after Linux epoch (0)")
+    if len(timestamps) and timestamps.max() > time_ns() // 1_000_000_000:
+        raise ValueError("Timestamp cannot be in the future")
+
+def _strict_int_array(items: Any, dtype: np.dtype) -> np.ndarray:
+    """
+    Convert a JSON array of integers to a NumPy array.
+
+    Elements must be actual integers, as with StrictInt: floats, numeric
+    strings and booleans are rejected rather than coerced.
+
+    Raises:
+        ValueError: If items is not an array of integers
+    """
+    if type(items) is not list or not all(type(item) is int for item in items):
+        raise ValueError("values, timestamps and label_codes must be arrays of integers")
+    try:
+        return np.array(items, dtype=dtype)
+    except OverflowError:
+        raise ValueError("values, timestamps and label_codes must be arrays of integers")
+
+def _bulk_columns_from_json(data: Any):
+    """
+    Extract the columns of a JSON bulk upload.
+
+    Args:
+        data: Parsed request body
+
+    Returns:
+        Tuple of (values, timestamps, label_codes) arrays
+
+    Raises:
+        ValueError: If the body is malformed or a timestamp is out of range
+    """
+    if not isinstance(data, dict) or not data:
+        raise ValueError("Empty request data")
+    if 'values' not in data:
+        raise ValueError("Missing required field: values")
+    if 'labels' not in data and 'label_codes' not in data:
+        raise ValueError("Missing required field: labels")
+
+    values = _strict_int_array(data['values'], np.int64)
+    if 'timestamps' in data:
+        timestamps = _strict_int_array(data['timestamps'], np.int64)
+    else:
+        timestamps = np.full(len(values), time_ns() // 1_000_000_000, dtype=np.int64)
+    if 'label_codes' in data:
+        label_codes = _strict_int_array(data['label_codes'], np.int32)
+        if label_codes.ndim != 1:
+            raise ValueError("label_codes must be an array of integers")
+
+    if values.ndim != 1 or timestamps.ndim != 1:
+        raise ValueError("values and timestamps must be arrays of integers")
+    if len(timestamps) != len(values):
+        raise ValueError("values and timestamps must have the same length")
+    if 'label_codes' in data:
+        if len(label_codes) != len(values):
+            raise ValueError("values, timestamps and label codes must have the same length")
+    else:
+        labels = data['labels']
+        if type(labels) is not list or len(labels) != len(values):
+            raise ValueError("labels must be an array with one label per value")
+        if not all(type(label) is str and label.strip() for label in labels):
+            raise ValueError("All labels must be non-empty strings")
+    _check_bulk_timestamps(timestamps)
+
+    # Encoding stores new labels for good, so it only happens once the
+    # whole upload is known to be valid
+    if 'label_codes' not in data:
+        label_codes = labeled_metrics_store.encode_labels(labels)
+    return values, timestamps, label_codes
+
+@labeled_metrics_bp.route('/bulk', methods=['POST'])
+def add_labeled_metrics_bulk():
+    """
+    Add many labeled metrics in a single request
+    ---
+    tags:
+      - Labeled Metrics
+    description: |
+      Appends a batch of labeled metrics given as columns.
+      
+      JSON bodies carry parallel arrays: "values", optional "timestamps"
+      (defaulting to now), and either "labels" or "label_codes" referring to
+      labels that are already stored.
+      
+      Bodies sent as application/octet-stream are packed little-endian records
+      of (label_code int32, value int64, timestamp int64), 20 bytes each.
+    consumes:
+      - application/json
+      - application/octet-stream
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          properties:
+            labels:
+              type: array
+              items:
+                type: string
+              example: [cpu_usage, memory_usage]
+            values:
+              type: array
+              items:
+                type: integer
+              example: [75, 2048]
+            timestamps:
+              type: array
+              items:
+                type: integer
+              example: [1678901234, 1678901234]
+    responses:
+      201:
+        description: Successfully created labeled metrics
+        examples:
+          application/json:
+            status: success
+            first_id: 0
+            count: 2
+      400:
+        description: Invalid input
+    """
+    if request.mimetype == 'application/octet-stream':
+        body = request.get_data()
+        if len(body) % BULK_RECORD_DTYPE.itemsize:
+            return _err(f"Binary payload must consist of {BULK_RECORD_DTYPE.itemsize}-byte records")
+        records = np.frombuffer(body, dtype=BULK_RECORD_DTYPE)
+        values = records['value']
+        timestamps = records['timestamp']
+        label_codes = records['label_code']
+        try:
+            _check_bulk_timestamps(timestamps)
+        except ValueError as e:
+            return _err(str(e))
+    else:
+        try:
+            data = load_json_body()
+        except ValueError:
+            return _err("Request body must be valid JSON")
+        try:
+            values, timestamps, label_codes = _bulk_columns_from_json(data)
+        except ValueError as e:
+            return _err(str(e))
+
+    try:
+        first_id = labeled_metrics_store.extend_columns(values, timestamps, label_codes)
+    except ValueError as e:
+        return _err(str(e))
+    return json_response({"status": "success", "first_id": first_id, "count": len(values)}, 201)
 
 @labeled_metrics_bp.route('/transform', methods=['POST'])
 def transform_labeled_metrics():
@@ -108,6 +407,11 @@ def transform_labeled_metrics():
       - Transformations are applied sequentially in the order provided
       - The label_filter parameter is unique to labeled metrics
     parameters:
+      - in: query
+        name: stream
+        type: integer
+        required: false
+        description: Set to 1 to stream the result array in chunks instead of buffering it
       - in: body
         name: body
         required: true
@@ -182,43 +486,49 @@ def transform_labeled_metrics():
               type: string
               description: Error message
     """
-    data = request.json
+    data = request.get_data()
     
-    # Validate transformations
-    is_valid, error = validate_transformations(data)
-    if not is_valid:
-        return jsonify({"error": error}), 400
-        
-    # Create a pipeline with the labeled metrics directly using our new label-aware transformations
-    pipeline = create_pipeline(labeled_metrics_store)
+    if not data:
+        return _err("Empty request data")
     
-    # Apply transformations in sequence
-    for transform_data in data['transformations']:
-        # Apply label filter if present
-        if 'label_filter' in transform_data:
-            label_filter = transform_data['label_filter']
-            if isinstance(label_filter, str):
-                # Single label filter (exact match)
-                pipeline.filter_by_label('label_eq', label_filter)
-            elif isinstance(label_filter, list):
-                # Multiple label filter (match any in set)
-                pipeline.filter_by_labels('label_in', label_filter)
-            else:
-                return jsonify({"error": f"Invalid label_filter format: {label_filter}"}), 400
+    # Validate the whole request against the transformations schema in one pass
+    try:
+        transformations_request = TransformationsRequest.model_validate_json(data)
+    except ValidationError as e:
+        return _err(transformations_error_message(e))
         
-        # Apply value filter if present
-        if 'filter' in transform_data:
-            filter_data = transform_data['filter']
-            pipeline.filter(type=filter_data['type'], value=filter_data['value'])
+    # Plan the transformations, then evaluate them in a single pass
+    pipeline = create_planned_pipeline(labeled_metrics_store)
+    
+    try:
+        for transform in transformations_request.transformations:
+            # Apply label filter if present
+            if transform.label_filter is not None:
+                # Resolve labels to their dictionary codes once; unknown labels match nothing
+                codes = labeled_metrics_store.encode_filter(transform.label_filter)
+                pipeline.plan('filter_by_label_codes', codes=codes)
+            
+            # Apply value filter if present
+            if transform.filter is not None:
+                pipeline.plan('filter', type=transform.filter.type, value=transform.filter.value)
+            
+            # Apply aggregation and/or time grouping
+            if transform.aggregation is not None and transform.time_grouping is not None:
+                pipeline.plan(
+                    'group_by_time',
+                    time_grouping=transform.time_grouping,
+                    aggregation=transform.aggregation
+                )
+            elif transform.aggregation is not None:
+                pipeline.plan('aggregate', type=transform.aggregation)
         
-        # Apply aggregation and/or time grouping
-        if 'aggregation' in transform_data and 'time_grouping' in transform_data:
-            pipeline.group_by_time(transform_data['time_grouping'], transform_data['aggregation'])
-        elif 'aggregation' in transform_data:
-            pipeline.aggregate(transform_data['aggregation'])
+        result = pipeline.run()
+    except ValueError as e:
+        return _err(str(e))
     
-    result = pipeline.execute_to_dicts()
-    return jsonify(result)
+    if wants_stream():
+        return stream_json_array(chunked(result))
+    return json_response(result)
 
 @labeled_metrics_bp.route('/pipeline', methods=['POST'])
 def labeled_pipeline_transform():
@@ -302,6 +612,11 @@ def labeled_pipeline_transform():
       2. Consistent Labels: Ensure your label names are consistent (e.g., "CPU_USAGE" vs "cpu_usage")
       3. Related Labels: When using multiple labels, make sure they're logically related for meaningful analysis
     parameters:
+      - in: query
+        name: stream
+        type: integer
+        required: false
+        description: Set to 1 to stream the result array in chunks instead of buffering it
       - in: body
         name: body
         required: true
@@ -366,94 +681,41 @@ def labeled_pipeline_transform():
               type: string
               description: Error message
     """
-    data = request.json
+    data = request.get_data()
     
     if not data:
-        return jsonify({"error": "Empty request data"}), 400
+        return _err("Empty request data")
+    
+    # Validate the whole request against the pipeline schema in one pass
+    try:
+        pipeline_request = PipelineRequest.model_validate_json(data)
+    except ValidationError as e:
+        return _err(_pipeline_error_message(e))
+    
+    # Without any steps the result is every stored metric
+    if not pipeline_request.pipeline:
+        if wants_stream():
+            return stream_json_array(labeled_metrics_store.iter_dicts())
+        return json_response(labeled_metrics_store.to_dicts())
     
-    # Create a pipeline directly with labeled metrics
+    # Plan the pipeline steps, then evaluate them in a single pass
     try:
-        pipeline = create_pipeline(labeled_metrics_store)
+        pipeline = create_planned_pipeline(labeled_metrics_store)
         
-        # Apply pipeline operations if any
-        if 'pipeline' in data and isinstance(data['pipeline'], list):
-            for i, step in enumerate(data['pipeline']):
-                if 'operation' not in step:
-                    return jsonify({"error": f"Missing operation in pipeline step {i}"}), 400
-                
-                operation = step['operation']
-                
-                try:
-                    if operation == 'filter_by_label':
-                        if 'label' not in step:
-                            return jsonify({"error": f"filter_by_label operation requires label (step {i})"}), 400
-                        pipeline.filter_by_label('label_eq', step['label'])
-                    
-                    elif operation == 'filter_by_labels':
-                        if 'labels' not in step or not isinstance(step['labels'], list):
-                            return jsonify({"error": f"filter_by_labels operation requires labels array (step {i})"}), 400
-                        pipeline.filter_by_labels('label_in', step['labels'])
-                    
-                    elif operation == 'filter':
-                        if 'type' not in step or 'value' not in step:
-                            return jsonify({"error": f"Filter operation requires type and value (step {i})"}), 400
-                        pipeline.filter(type=step['type'], value=int(step['value']))
-                    
-                    elif operation == 'greater_than':
-                        if 'value' not in step:
-                            return jsonify({"error": f"greater_than operation requires value (step {i})"}), 400
-                        pipeline.greater_than(value=int(step['value']))
-                    
-                    elif operation == 'less_than':
-                        if 'value' not in step:
-                            return jsonify({"error": f"less_than operation requires value (step {i})"}), 400
-                        pipeline.less_than(value=int(step['value']))
-                    
-                    elif operation == 'equal_to':
-                        if 'value' not in step:
-                            return jsonify({"error": f"equal_to operation requires value (step {i})"}), 400
-                        pipeline.equal_to(value=int(step['value']))
-                    
-                    elif operation == 'aggregate':
-                        if 'type' not in step:
-                            return jsonify({"error": f"aggregate operation requires type (step {i})"}), 400
-                        pipeline.aggregate(type=step['type'])
-                    
-                    elif operation == 'sum':
-                        pipeline.sum()
-                    
-                    elif operation == 'average':
-                        pipeline.average()
-                    
-                    elif operation == 'group_by':
-                        if 'time_grouping' not in step or 'aggregation' not in step:
-                            return jsonify({"error": f"group_by operation requires time_grouping and aggregation (step {i})"}), 400
-                        pipeline.group_by(
-                            time_grouping=step['time_grouping'],
-                            aggregation=step['aggregation']
-                        )
-                    
-                    elif operation == 'group_by_minute':
-                        agg = step.get('aggregation', 'sum')
-                        pipeline.group_by_minute(aggregation=agg)
-                    
-                    elif operation == 'group_by_hour':
-                        agg = step.get('aggregation', 'sum')
-                        pipeline.group_by_hour(aggregation=agg)
-                    
-                    elif operation == 'group_by_day':
-                        agg = step.get('aggregation', 'sum')
-                        pipeline.group_by_day(aggregation=agg)
-                    
-                    else:
-                        return jsonify({"error": f"Unknown operation: {operation} (step {i})"}), 400
-                
-                except ValueError as e:
-                    return jsonify({"error": f"Error in pipeline step {i}: {str(e)}"}), 400
+        for i, step in enumerate(pipeline_request.pipeline):
+            try:
+                OPS[step.operation](pipeline, step)
+            except ValueError as e:
+                return _err(f"Error in pipeline step {i}: {str(e)}")
         
         # Execute the pipeline and return results
-        result = pipeline.execute_to_dicts()
-        return jsonify(result)
+        try:
+            result = pipeline.run()
+        except ValueError as e:
+            return _err(f"Error executing pipeline: {str(e)}")
+        if wants_stream():
+            return stream_json_array(chunked(result))
+        return json_response(result)
     
     except Exception as e:
-        return jsonify({"error": f"Error processing pipeline: {str(e)}"}), 500
\ No newline at end of file
+        return _err(f"Error processing pipeline: {str(e)}", 500)
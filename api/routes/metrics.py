@@ -1,17 +1,217 @@
 """
 Endpoints for basic metrics operations.
 """
-from datetime import datetime
-from flask import request, jsonify, Blueprint
-from metric_query_simplified import (
-    Metric, transform_metrics_to_dicts, create_pipeline,
-    validate_metric, validate_transformations
+from functools import lru_cache
+from operator import methodcaller
+from time import time_ns
+from typing import Any, Callable, List, NamedTuple, Optional, Tuple
+from uuid import uuid4
+import numpy as np
+from flask import Blueprint, current_app, request
+from pydantic import ValidationError
+from metric_query_simplified import Metric, transform_metrics_to_dicts, create_pipeline
+from models.pipeline import AGGREGATION_TYPES, FILTER_OPS, TIME_GROUPING_SECONDS, ColumnarPipeline
+from models.schemas import (
+    MetricInput, TransformationsRequest, metric_error_message, transformations_error_message
 )
 from models.store import metrics_store
+from utils.utils import (
+    chunked, error_response, json_response, load_json_body, stream_json_array, wants_stream
+)
 
 # Create a Blueprint for the metrics routes
 metrics_bp = Blueprint('metrics', __name__)
 
+# Tells apart store versions of other worker processes and earlier restarts
+_ETAG_PREFIX = uuid4().hex[:12]
+
+class _BadStep(Exception):
+    """A pipeline step that cannot be compiled, with the response it maps to"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+# Fields of a pipeline step that determine the compiled plan
+_PLAN_FIELDS = ('operation', 'type', 'value', 'time_grouping', 'aggregation')
+
+def _int_value(i: int, operation: str, value: Any) -> int:
+    """Parse the integer operand of a filter step"""
+    try:
+        return int(value)
+    except ValueError as e:
+        raise _BadStep(f"Error in pipeline step {i}: {str(e)}")
+    except Exception as e:
+        raise _BadStep(f"Unexpected error in pipeline step {i}: {str(e)}", 500)
+
+def _op_filter(i, operation, type_, value, time_grouping, aggregation):
+    """Compile a value filter"""
+    return methodcaller('filter', type=type_, value=_int_value(i, operation, value))
+
+def _op_comparison(i, operation, type_, value, time_grouping, aggregation):
+    """Compile a greater_than, less_than or equal_to filter"""
+    return methodcaller(operation, value=_int_value(i, operation, value))
+
+def _op_aggregate(i, operation, type_, value, time_grouping, aggregation):
+    """Compile an aggregation"""
+    return methodcaller('aggregate', type=type_)
+
+def _op_aggregation_shorthand(i, operation, type_, value, time_grouping, aggregation):
+    """Compile a sum or average aggregation"""
+    return methodcaller(operation)
+
+def _op_group_by(i, operation, type_, value, time_grouping, aggregation):
+    """Compile a time grouping"""
+    return methodcaller('group_by', time_grouping=time_grouping, aggregation=aggregation)
+
+def _op_group_by_shorthand(i, operation, type_, value, time_grouping, aggregation):
+    """Compile a minute, hour or day grouping"""
+    return methodcaller(operation, aggregation='sum' if aggregation is None else aggregation)
+
+# Compiler for each pipeline operation. A handler takes the step index and
+# the values of _PLAN_FIELDS, which include every field listed for the
+# operation in _REQUIRED_FIELDS, and returns a callable applying the step.
+_OPS = {
+    'filter': _op_filter,
+    'greater_than': _op_comparison,
+    'less_than': _op_comparison,
+    'equal_to': _op_comparison,
+    'aggregate': _op_aggregate,
+    'sum': _op_aggregation_shorthand,
+    'average': _op_aggregation_shorthand,
+    'group_by': _op_group_by,
+    'group_by_minute': _op_group_by_shorthand,
+    'group_by_hour': _op_group_by_shorthand,
+    'group_by_day': _op_group_by_shorthand,
+}
+
+_VALUE = frozenset(('value',))
+
+# Fields each operation cannot do without, and the error when any is missing;
+# other fields are optional
+_REQUIRED_FIELDS = {
+    'filter': (frozenset(('type', 'value')), "Filter operation requires type and value"),
+    'greater_than': (_VALUE, "greater_than operation requires value"),
+    'less_than': (_VALUE, "less_than operation requires value"),
+    'equal_to': (_VALUE, "equal_to operation requires value"),
+    'aggregate': (frozenset(('type',)), "aggregate operation requires type"),
+    'group_by': (frozenset(('time_grouping', 'aggregation')), "group_by operation requires time_grouping and aggregation"),
+}
+
+def _compile_step(i: int, step: Tuple) -> Callable:
+    """
+    Compile one normalized pipeline step into a callable that applies it.
+
+    Args:
+        i: Index of the step, for error messages
+        step: Values of _PLAN_FIELDS for the step, with None for missing fields
+
+    Returns:
+        Callable taking the pipeline to apply the step to
+
+    Raises:
+        _BadStep: If the step is malformed
+    """
+    operation = step[0]
+    if operation is None:
+        raise _BadStep(f"Missing operation in pipeline step {i}")
+    try:
+        handler = _OPS.get(operation)
+    except TypeError:
+        handler = None
+    if handler is None:
+        raise _BadStep(f"Unknown operation: {operation} (step {i})")
+
+    if operation in _REQUIRED_FIELDS:
+        required, message = _REQUIRED_FIELDS[operation]
+        if not required.issubset(field for field, value in zip(_PLAN_FIELDS, step) if value is not None):
+            raise _BadStep(f"{message} (step {i})")
+    return handler(i, *step)
+
+# Filter steps that only compare metric values
+_VALUE_FILTERS = {'filter', 'greater_than', 'less_than', 'equal_to'}
+
+# Group-by operations with the time grouping in their name
+_GROUP_BY_SHORTHANDS = {'group_by_minute', 'group_by_hour', 'group_by_day'}
+
+class _Plan(NamedTuple):
+    """
+    Compiled pipeline: one callable per step, and whether it can run on columns.
+
+    When a step is malformed, steps holds the ones before it and error the
+    failure to report once they have been applied.
+    """
+    steps: Tuple[Callable, ...]
+    columnar: bool
+    error: Optional[_BadStep] = None
+
+def _is_columnar(steps: Tuple[Tuple, ...]) -> bool:
+    """
+    Check whether normalized steps are value filters followed by one aggregation.
+
+    Such pipelines are evaluated on the store's NumPy columns, where the
+    filters fold into a single selection mask that feeds the aggregation
+    kernel directly. Steps with arguments the Rust pipeline would reject are
+    left to it, so that it reports the error.
+    """
+    *filters, (operation, type_, _, time_grouping, aggregation) = steps
+    for filter_operation, filter_type, *_ in filters:
+        if filter_operation not in _VALUE_FILTERS:
+            return False
+        if filter_operation == 'filter' and not (isinstance(filter_type, str) and filter_type in FILTER_OPS):
+            return False
+
+    if operation in ('sum', 'average'):
+        return True
+    if operation == 'aggregate':
+        return type_ in AGGREGATION_TYPES
+    if operation == 'group_by':
+        return isinstance(time_grouping, str) and time_grouping in TIME_GROUPING_SECONDS and aggregation in AGGREGATION_TYPES
+    if operation in _GROUP_BY_SHORTHANDS:
+        return ('sum' if aggregation is None else aggregation) in AGGREGATION_TYPES
+    return False
+
+def _build_plan(steps: Tuple[Tuple, ...]) -> _Plan:
+    """Compile normalized pipeline steps"""
+    compiled = []
+    for i, step in enumerate(steps):
+        try:
+            compiled.append(_compile_step(i, step))
+        except _BadStep as e:
+            # Steps are checked as they are reached, so an earlier step that
+            # fails to apply is still the error the client sees
+            return _Plan(tuple(compiled), False, e.with_traceback(None))
+    return _Plan(tuple(compiled), _is_columnar(steps))
+
+@lru_cache(maxsize=256)
+def _compile_plan(steps: Tuple[Tuple, ...]) -> _Plan:
+    """Compile normalized pipeline steps, caching the plan per distinct pipeline"""
+    return _build_plan(steps)
+
+def _plan_for(pipeline_steps: List[Any]) -> _Plan:
+    """
+    Return the compiled plan for the steps of a pipeline request.
+
+    Requests repeating a pipeline that was already seen reuse its plan, so
+    the steps are only validated and dispatched on once.
+
+    Args:
+        pipeline_steps: The request's pipeline array
+
+    Returns:
+        The compiled plan, carrying the error of the first malformed step
+    """
+    steps = tuple(
+        tuple(step.get(field) for field in _PLAN_FIELDS) if isinstance(step, dict) else (None,) * len(_PLAN_FIELDS)
+        for step in pipeline_steps
+    )
+    try:
+        return _compile_plan(steps)
+    except TypeError:
+        # Unhashable field values (lists, objects) cannot be cached
+        return _build_plan(steps)
+
 @metrics_bp.route('/', methods=['GET'])
 def get_metrics():
     """
@@ -33,10 +233,21 @@ def get_metrics():
               timestamp:
                 type: integer
                 description: Unix timestamp in seconds
+        headers:
+          ETag:
+            type: string
+            description: Weak validator of the current store contents
+      304:
+        description: The metrics have not changed since the ETag sent in If-None-Match
     """
-    # Use to_dicts helper from our improved library
-    result = [{'value': m.value, 'timestamp': m.timestamp} for m in metrics_store]
-    return jsonify(result)
+    # The store only grows, so its version identifies the response body
+    etag = f'{_ETAG_PREFIX}-v{metrics_store.version}'
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = json_response(metrics_store.to_dicts())
+    response.set_etag(etag, weak=True)
+    return response
 
 @metrics_bp.route('/', methods=['POST'])
 def add_metric():
@@ -68,21 +279,125 @@ def add_metric():
       400:
         description: Invalid input
     """
-    data = request.json
+    try:
+        data = load_json_body()
+    except ValueError:
+        return error_response("Request body must be valid JSON")
+    
+    if not data:
+        return error_response("Empty metric data")
     
-    # Validate input
-    is_valid, error = validate_metric(data)
-    if not is_valid:
-        return jsonify({"error": error}), 400
+    # Validate input into a typed metric; integer fields must already be integers
+    try:
+        metric_input = MetricInput.model_validate(data)
+    except ValidationError as e:
+        return error_response(metric_error_message(e))
     
     # Create a new metric
+    timestamp = metric_input.timestamp
     metric = Metric(
-        value=int(data['value']),
-        timestamp=int(data.get('timestamp', datetime.now().timestamp()))
+        value=metric_input.value,
+        timestamp=timestamp if timestamp is not None else time_ns() // 1_000_000_000
     )
     
     metrics_store.append(metric)
-    return jsonify({"status": "success", "id": len(metrics_store) - 1}), 201
+    return json_response({"status": "success", "id": len(metrics_store) - 1}, 201)
+
+def _bulk_columns(data: Any):
+    """
+    Extract the value and timestamp columns of a bulk upload.
+
+    Args:
+        data: Parsed request body, a list of metric objects
+
+    Returns:
+        Tuple of (values, timestamps) int64 arrays
+
+    Raises:
+        ValueError: If the body is malformed or a timestamp is out of range
+    """
+    if not isinstance(data, list) or not data:
+        raise ValueError("Request body must be a non-empty array of metrics")
+
+    now = time_ns() // 1_000_000_000
+    try:
+        values = [metric['value'] for metric in data]
+        timestamps = [metric.get('timestamp') for metric in data]
+    except KeyError:
+        raise ValueError("Missing required field: value")
+    except (TypeError, AttributeError):
+        raise ValueError("Every metric must be an object with integer value and timestamp")
+
+    # Accept exactly what MetricInput (StrictInt) accepts: no floats, numeric strings or booleans
+    if not all(type(value) is int for value in values):
+        raise ValueError("Value must be an integer")
+    timestamps = [now if timestamp is None else timestamp for timestamp in timestamps]
+    if not all(type(timestamp) is int for timestamp in timestamps):
+        raise ValueError("Timestamp must be an integer")
+    try:
+        values = np.array(values, dtype=np.int64)
+    except OverflowError:
+        raise ValueError("Value must fit in a 64-bit signed integer")
+    try:
+        timestamps = np.array(timestamps, dtype=np.int64)
+    except OverflowError:
+        raise ValueError("Timestamp must fit in a 64-bit signed integer")
+
+    if timestamps.min() < 0:
+        raise ValueError("Timestamp must be after Linux epoch (0)")
+    if timestamps.max() > now:
+        raise ValueError("Timestamp cannot be in the future")
+    return values, timestamps
+
+@metrics_bp.route('/bulk', methods=['POST'])
+def add_metrics_bulk():
+    """
+    Add many metrics in a single request
+    ---
+    tags:
+      - Metrics
+    description: |
+      Appends a batch of metrics. Each metric has the same shape as in
+      POST /metrics; timestamps default to now. The batch is validated as
+      a whole and either every metric is added or none is.
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: array
+          items:
+            type: object
+            properties:
+              value:
+                type: integer
+                example: 42
+              timestamp:
+                type: integer
+                example: 1678901234
+    responses:
+      201:
+        description: Successfully created metrics
+        examples:
+          application/json:
+            status: success
+            first_id: 0
+            count: 2
+      400:
+        description: Invalid input
+    """
+    try:
+        data = load_json_body()
+    except ValueError:
+        return error_response("Request body must be valid JSON")
+    
+    try:
+        values, timestamps = _bulk_columns(data)
+    except ValueError as e:
+        return error_response(str(e))
+    
+    first_id = metrics_store.extend_columns(values, timestamps)
+    return json_response({"status": "success", "first_id": first_id, "count": len(values)}, 201)
 
 @metrics_bp.route('/transform', methods=['POST'])
 def transform_metrics():
@@ -102,6 +417,11 @@ def transform_metrics():
       - Input metrics are not guaranteed to be ordered
       - Metrics cannot be pre-sorted as they are part of a larger stream
     parameters:
+      - in: query
+        name: stream
+        type: integer
+        required: false
+        description: Set to 1 to stream the result array in chunks instead of buffering it
       - in: body
         name: body
         required: true
@@ -166,16 +486,25 @@ def transform_metrics():
               type: string
               description: Error message
     """
-    data = request.json
+    try:
+        data = load_json_body()
+    except ValueError:
+        return error_response("Request body must be valid JSON")
     
-    # Validate transformations
-    is_valid, error = validate_transformations(data)
-    if not is_valid:
-        return jsonify({"error": error}), 400
+    if not data:
+        return error_response("Empty request data")
+    
+    # Validate the whole request against the transformations schema in one pass
+    try:
+        TransformationsRequest.model_validate(data)
+    except ValidationError as e:
+        return error_response(transformations_error_message(e))
     
     # Use our improved transformation function
     result = transform_metrics_to_dicts(metrics_store, data['transformations'])
-    return jsonify(result)
+    if wants_stream():
+        return stream_json_array(chunked(result))
+    return json_response(result)
 
 @metrics_bp.route('/pipeline', methods=['POST'])
 def pipeline_transform():
@@ -257,6 +586,11 @@ def pipeline_transform():
       2. Multiple Aggregations: You can't chain multiple aggregations together (e.g., sum, then avg).
       3. Time Unit Selection: Choose appropriate time units - minute grouping on months of data will return many data points.
     parameters:
+      - in: query
+        name: stream
+        type: integer
+        required: false
+        description: Set to 1 to stream the result array in chunks instead of buffering it
       - in: body
         name: body
         required: true
@@ -314,101 +648,61 @@ def pipeline_transform():
               type: string
               description: Error message
     """
-    data = request.json
+    try:
+        data = load_json_body()
+    except ValueError:
+        return error_response("Request body must be valid JSON")
     
     if not data or 'pipeline' not in data:
-        return jsonify({"error": "Missing required field: pipeline"}), 400
+        return error_response("Missing required field: pipeline")
     
     pipeline_steps = data['pipeline']
     if not isinstance(pipeline_steps, list) or not pipeline_steps:
-        return jsonify({"error": "Pipeline must be a non-empty array"}), 400
+        return error_response("Pipeline must be a non-empty array")
+    
+    plan = _plan_for(pipeline_steps)
+    
+    if plan.columnar:
+        # Filters and the aggregation run as one pass over the store's columns
+        pipeline = ColumnarPipeline(metrics_store.values, metrics_store.timestamps)
+        try:
+            for apply_step in plan.steps:
+                apply_step(pipeline)
+        except ValueError as e:
+            # Nothing left to aggregate; answer like the labeled pipeline does
+            return error_response(f"Error executing pipeline: {str(e)}")
+        result = pipeline.execute_to_dicts()
+        if wants_stream():
+            return stream_json_array(chunked(result))
+        return json_response(result)
     
     # Create a pipeline with the metrics
     try:
-        # Create a pipeline with the metrics
         pipeline = create_pipeline(metrics_store)
         
         # Apply each operation in sequence
-        for i, step in enumerate(pipeline_steps):
-            if 'operation' not in step:
-                return jsonify({"error": f"Missing operation in pipeline step {i}"}), 400
-            
-            operation = step['operation']
-            
+        for i, apply_step in enumerate(plan.steps):
             try:
-                if operation == 'filter':
-                    if 'type' not in step or 'value' not in step:
-                        return jsonify({"error": f"Filter operation requires type and value (step {i})"}), 400
-                    pipeline.filter(type=step['type'], value=int(step['value']))
-                
-                elif operation == 'greater_than':
-                    if 'value' not in step:
-                        return jsonify({"error": f"greater_than operation requires value (step {i})"}), 400
-                    pipeline.greater_than(value=int(step['value']))
-                
-                elif operation == 'less_than':
-                    if 'value' not in step:
-                        return jsonify({"error": f"less_than operation requires value (step {i})"}), 400
-                    pipeline.less_than(value=int(step['value']))
-                
-                elif operation == 'equal_to':
-                    if 'value' not in step:
-                        return jsonify({"error": f"equal_to operation requires value (step {i})"}), 400
-                    pipeline.equal_to(value=int(step['value']))
-                
-                elif operation == 'aggregate':
-                    if 'type' not in step:
-                        return jsonify({"error": f"aggregate operation requires type (step {i})"}), 400
-                    pipeline.aggregate(type=step['type'])
-                
-                elif operation == 'sum':
-                    pipeline.sum()
-                
-                elif operation == 'average':
-                    pipeline.average()
-                
-                elif operation == 'group_by':
-                    if 'time_grouping' not in step or 'aggregation' not in step:
-                        return jsonify({"error": f"group_by operation requires time_grouping and aggregation (step {i})"}), 400
-                    pipeline.group_by(
-                        time_grouping=step['time_grouping'],
-                        aggregation=step['aggregation']
-                    )
-                
-                elif operation == 'group_by_minute':
-                    agg = step.get('aggregation', 'sum')
-                    pipeline.group_by_minute(aggregation=agg)
-                
-                elif operation == 'group_by_hour':
-                    agg = step.get('aggregation', 'sum')
-                    pipeline.group_by_hour(aggregation=agg)
-                
-                elif operation == 'group_by_day':
-                    agg = step.get('aggregation', 'sum')
-                    pipeline.group_by_day(aggregation=agg)
-                
-                else:
-                    return jsonify({"error": f"Unknown operation: {operation} (step {i})"}), 400
-            
+                apply_step(pipeline)
             except ValueError as e:
-                return jsonify({"error": f"Error in pipeline step {i}: {str(e)}"}), 400
+                return error_response(f"Error in pipeline step {i}: {str(e)}")
             except Exception as e:
                 import logging
                 logging.error(f"Unexpected error in pipeline step {i}: {str(e)}")
-                return jsonify({"error": f"Unexpected error in pipeline step {i}: {str(e)}"}), 500
+                return error_response(f"Unexpected error in pipeline step {i}: {str(e)}", 500)
+        if plan.error is not None:
+            return error_response(plan.error.message, plan.error.status)
         
         # Execute the pipeline and return results
         try:
             result = pipeline.execute_to_dicts()
-            return jsonify(result)
-        except Exception as e:
-            import logging
-            logging.error(f"Error executing pipeline: {str(e)}")
-            # Fallback to returning original metrics
-            result = [{'value': m.value, 'timestamp': m.timestamp} for m in metrics_store]
-            return jsonify(result)
+            if wants_stream():
+                return stream_json_array(chunked(result))
+            return json_response(result)
+        except ValueError as e:
+            return error_response(f"Error executing pipeline: {str(e)}")
     
     except Exception as e:
         import logging
         logging.error(f"Error processing pipeline: {str(e)}")
-        return jsonify({"error": f"Error processing pipeline: {str(e)}"}), 500
\ No newline at end of file
+        return error_response(f"Error processing pipeline: {str(e)}", 500)
\ No newline at end of file
@@ -1,10 +1,9 @@
 """
 Test endpoints for demonstrating the API's functionality.
 """
-from datetime import datetime
-import json
-from flask import jsonify, Blueprint, request
-from utils.utils import load_test_data
+from time import time_ns
+from flask import Blueprint
+from utils.utils import error_response, json_response, load_json_body, load_test_data
 from metric_query_simplified import create_pipeline, transform_metrics_to_dicts
 from models.store import metrics_store
 
@@ -69,18 +68,20 @@ def run_test():
       400:
         description: Invalid request
     """
-    data = request.json
+    try:
+        data = load_json_body()
+    except ValueError:
+        return error_response("Request body must be valid JSON")
     if not data or 'test_type' not in data:
-        return jsonify({"error": "Invalid request. Required field: test_type"}), 400
+        return error_response("Invalid request. Required field: test_type")
     
-    # Load data from test_data.json if metrics_store is empty
-    global metrics_store
+    # Load data from test_data.json if metrics_store is empty, filling the
+    # shared store in place so every module sees the same metrics
     if not metrics_store:
         try:
-            test_data = load_test_data()
-            metrics_store = test_data["metrics"]
+            metrics_store.extend(load_test_data()["metrics"])
         except Exception as e:
-            return jsonify({"error": f"Error loading test data: {str(e)}"}), 500
+            return error_response(f"Error loading test data: {str(e)}", 500)
     
     test_type = data['test_type']
     parameters = data.get('parameters', {})
@@ -101,16 +102,15 @@ def run_test():
             "sample_results": filtered[:5]
         }
         
-        return jsonify(result)
+        return json_response(result)
     
     # Time-based filtering test
     elif test_type == 'time_filtering':
         days_ago = parameters.get('days_ago', 1)
-        cutoff_time = int(datetime.now().timestamp()) - (days_ago * 24 * 60 * 60)
+        cutoff_time = time_ns() // 1_000_000_000 - (days_ago * 24 * 60 * 60)
         
-        # Use fluent pipeline API 
-        pipeline = create_pipeline(metrics_store)
-        filtered = pipeline.greater_than_or_equal(cutoff_time).execute_to_dicts()
+        # A pure time range needs no pipeline: binary search the timestamp index
+        filtered = metrics_store.to_dicts(metrics_store.since(cutoff_time))
         
         result = {
             "test_name": "Time-based filtering",
@@ -120,7 +120,7 @@ def run_test():
             "sample_results": filtered[:5]
         }
         
-        return jsonify(result)
+        return json_response(result)
     
     # Aggregation test
     elif test_type == 'aggregation':
@@ -148,7 +148,7 @@ def run_test():
             "results": result_metrics
         }
         
-        return jsonify(result)
+        return json_response(result)
         
     # Time grouping test
     elif test_type == 'time_grouping':
@@ -178,7 +178,7 @@ def run_test():
             "results": sorted_results
         }
         
-        return jsonify(result)
+        return json_response(result)
     
     # Chained transformations test
     elif test_type == 'chained_transformations':
@@ -202,7 +202,7 @@ def run_test():
             "results": result_metrics
         }
         
-        return jsonify(result)
+        return json_response(result)
     
     # Fluent API test
     elif test_type == 'fluent_api':
@@ -233,7 +233,7 @@ def run_test():
             "results": result_metrics
         }
         
-        return jsonify(result)
+        return json_response(result)
     
     else:
-        return jsonify({"error": f"Unknown test type: {test_type}"}), 400
\ No newline at end of file
+        return error_response(f"Unknown test type: {test_type}")
\ No newline at end of file
@@ -6,10 +6,17 @@ This script demonstrates how the Metric Query Interface might be used and
 provides test cases to validate the implementation.
 """
 
-import json
-import datetime
+import sys
+from functools import lru_cache
+from itertools import islice
+import numpy as np
 import metric_query_library as mq
-from typing import List, Dict, Any, Union
+from typing import List, Dict, Any, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 class FilterType:
     VALUE = "value"
@@ -43,67 +50,93 @@ class GroupByType:
     LABEL = "label"
 
 # Helper functions to convert JSON to Metric objects
+def _json_columns(data: List[Dict[str, Any]]):
+    """Extract the value and timestamp (in seconds) columns of JSON metrics"""
+    values = np.fromiter((item["value"] for item in data), dtype=np.int64, count=len(data))
+    timestamps = np.fromiter((item["timestamp"] for item in data), dtype=np.int64, count=len(data))
+    timestamps //= 1000
+    return values, timestamps
+
 def json_to_basic_metrics(data: List[Dict[str, Any]]) -> List[mq.Metric]:
     """Convert JSON data to basic Metric objects"""
-    return [mq.Metric(value=item["value"], timestamp=item["timestamp"] // 1000) for item in data]
+    return mq.Metric.from_arrays(*_json_columns(data))
 
 def json_to_labeled_metrics(data: List[Dict[str, Any]]) -> List:
     """Convert JSON data to LabeledMetric objects"""
-    return [mq.LabeledMetric(label=item["label"], value=item["value"], timestamp=item["timestamp"] // 1000) for item in data]
+    return mq.LabeledMetric.from_arrays([item["label"] for item in data], *_json_columns(data))
+
+# Extension filter, aggregation and time grouping type for each supported
+# harness operator
+_FILTER_TYPES = {
+    FilterOperator.GT: "gt",
+    FilterOperator.LT: "lt",
+    FilterOperator.GTE: "ge",
+    FilterOperator.LTE: "le",
+    FilterOperator.EQ: "eq",
+}
+
+_AGGREGATION_TYPES = {
+    AggregationType.SUM: "sum",
+    AggregationType.AVG: "avg",
+    AggregationType.MIN: "min",
+    AggregationType.MAX: "max",
+}
+
+_TIME_GROUPINGS = {
+    TimeGrouping.MINUTE: "minute",
+    TimeGrouping.HOUR: "hour",
+    TimeGrouping.DAY: "day",
+}
 
-# Helper function to create transformations
+def _lookup(table: Dict[str, str], key: str, kind: str) -> str:
+    """Look up an extension type, rejecting keys the extension does not support"""
+    try:
+        return table[key]
+    except KeyError:
+        raise ValueError(f"Unsupported {kind}: {key}") from None
+
+# Helper function to create transformations; identical requests share one
+# cached transformation, so callers must not modify the result
+@lru_cache(maxsize=128)
 def create_filter_transformation(filter_type: str, operator: str, value: Any) -> mq.Transformation:
     """Create a filter transformation"""
     transformation = mq.Transformation()
+    # Only value filters are supported; other filter types leave the metrics unchanged
     if filter_type == FilterType.VALUE:
-        if operator == FilterOperator.GT:
-            transformation.filter = mq.Filter("gt", value)
-        elif operator == FilterOperator.LT:
-            transformation.filter = mq.Filter("lt", value)
-        elif operator == FilterOperator.GTE:
-            transformation.filter = mq.Filter("ge", value)
-        elif operator == FilterOperator.LTE:
-            transformation.filter = mq.Filter("le", value)
-        elif operator == FilterOperator.EQ:
-            transformation.filter = mq.Filter("eq", value)
-            transformation.filter = mq.Filter.Equal(value=value)
-    
+        transformation.filter = mq.Filter(_lookup(_FILTER_TYPES, operator, "filter operator"), value)
     return transformation
 
+@lru_cache(maxsize=128)
 def create_aggregation_transformation(agg_type: str, time_grouping: str = None) -> mq.Transformation:
     """Create an aggregation transformation"""
     transformation = mq.Transformation()
-    
-    if agg_type == AggregationType.SUM:
-        transformation.aggregation = mq.Aggregation("sum")
-    elif agg_type == AggregationType.AVG:
-        transformation.aggregation = mq.Aggregation("avg")
-    elif agg_type == AggregationType.MIN:
-        transformation.aggregation = mq.Aggregation("min")
-    elif agg_type == AggregationType.MAX:
-        transformation.aggregation = mq.Aggregation("max")
-    
+    transformation.aggregation = mq.Aggregation(_lookup(_AGGREGATION_TYPES, agg_type, "aggregation type"))
     if time_grouping:
-        if time_grouping == TimeGrouping.HOUR:
-            transformation.time_grouping = mq.TimeGrouping("hour")
-        elif time_grouping == TimeGrouping.MINUTE:
-            transformation.time_grouping = mq.TimeGrouping("minute")
-        elif time_grouping == TimeGrouping.DAY:
-            transformation.time_grouping = mq.TimeGrouping("day")
-    
+        transformation.time_grouping = mq.TimeGrouping(_lookup(_TIME_GROUPINGS, time_grouping, "time grouping"))
     return transformation
 
 # Convert metrics to a human-readable format for display
-def format_metrics(metrics: List[mq.Metric]) -> List[Dict[str, Any]]:
-    """Convert metrics to a readable format"""
-    result = []
-    for metric in metrics:
-        time_str = datetime.datetime.fromtimestamp(metric.timestamp).strftime('%Y-%m-%d %H:%M:%S')
-        result.append({
-            "value": metric.value,
-            "timestamp": time_str
-        })
-    return result
+def format_metrics(metrics: List[mq.Metric], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Convert metrics to a readable format, with timestamps shown in UTC.
+    
+    Only the first limit metrics are converted when a limit is given, without
+    copying them out of the list first.
+    """
+    count = len(metrics) if limit is None else min(limit, len(metrics))
+    if not count:
+        return []
+    timestamps = np.fromiter((metric.timestamp for metric in islice(metrics, count)), dtype=np.int64, count=count)
+    # Format every timestamp in one call instead of one strftime per metric
+    time_strs = np.char.replace(np.datetime_as_string(timestamps.view('datetime64[s]'), unit='s'), 'T', ' ')
+    return [
+        {"value": metric.value, "timestamp": time_str}
+        for metric, time_str in zip(islice(metrics, count), time_strs.tolist())
+    ]
+
+def _emit(lines: List[str]) -> None:
+    """Write a test case's report to stdout in one call"""
+    sys.stdout.write("\n".join(lines) + "\n")
 
 # Test cases
 
@@ -115,11 +148,13 @@ def test_basic_filtering(metrics: List[mq.Metric]):
     transformation = create_filter_transformation(FilterType.VALUE, FilterOperator.GT, 500)
     filtered = mq.transform(metrics, [transformation])
     
-    print("TEST CASE 1: Basic filtering")
-    print(f"Original count: {len(metrics)}")
-    print(f"Filtered count: {len(filtered)}")
-    print("Sample filtered metrics:", format_metrics(filtered[:3]))
-    print("\n")
+    _emit([
+        "TEST CASE 1: Basic filtering",
+        f"Original count: {len(metrics)}",
+        f"Filtered count: {len(filtered)}",
+        f"Sample filtered metrics: {format_metrics(filtered, limit=3)}",
+        "\n",
+    ])
     
     return filtered
 
@@ -128,19 +163,25 @@ def test_time_filtering(metrics: List[mq.Metric]):
     TEST CASE 2: Time-based filtering
     Filter metrics to only include those from the past 24 hours
     """
+    # Only this test case needs datetime, so import it here
+    import datetime
+    
     # Convert 24 hours ago to a timestamp
     one_day_ago = int(datetime.datetime.now().timestamp()) - (24 * 60 * 60)
     
     transformation = create_filter_transformation(FilterType.TIMESTAMP, FilterOperator.GTE, one_day_ago)
     filtered = mq.transform(metrics, [transformation])
     
-    print("TEST CASE 2: Time-based filtering")
-    print(f"Original count: {len(metrics)}")
-    print(f"Filtered count: {len(filtered)}")
-    print("Sample filtered metrics:", format_metrics(filtered[:3]))
-    print("\n")
+    _emit([
+        "TEST CASE 2: Time-based filtering",
+        f"Original count: {len(metrics)}",
+        f"Filtered count: {len(filtered)}",
+        f"Sample filtered metrics: {format_metrics(filtered, limit=3)}",
+        "\n",
+    ])
     
     return filtered
+
 def test_aggregation(metrics: List[mq.Metric]):
     """
     TEST CASE 3: Aggregation
@@ -149,19 +190,21 @@ def test_aggregation(metrics: List[mq.Metric]):
     transformation = create_aggregation_transformation(AggregationType.AVG)
     result = mq.transform(metrics, [transformation])
     
-    print("TEST CASE 3: Aggregation")
-    print(f"Original count: {len(metrics)}")
+    lines = [
+        "TEST CASE 3: Aggregation",
+        f"Original count: {len(metrics)}",
+    ]
     if len(result) == 1:
         # Print as a single aggregated value
-        print(f"Average value: {result[0].value}")
+        lines.append(f"Average value: {result[0].value}")
     else:
         # Fallback in case something went wrong
-        print(f"Result count: {len(result)}")
-        print("Result metrics:", format_metrics(result[:3]))
-    print("\n")
+        lines.append(f"Result count: {len(result)}")
+        lines.append(f"Result metrics: {format_metrics(result, limit=3)}")
+    lines.append("\n")
+    _emit(lines)
     
     return result
-    return result
 
 def test_time_grouping(metrics: List[mq.Metric]):
     """
@@ -171,11 +214,13 @@ def test_time_grouping(metrics: List[mq.Metric]):
     transformation = create_aggregation_transformation(AggregationType.AVG, TimeGrouping.HOUR)
     result = mq.transform(metrics, [transformation])
     
-    print("TEST CASE 4: Time grouping")
-    print(f"Original count: {len(metrics)}")
-    print(f"Result count: {len(result)}")
-    print("Sample grouped results:", format_metrics(result[:3]))
-    print("\n")
+    _emit([
+        "TEST CASE 4: Time grouping",
+        f"Original count: {len(metrics)}",
+        f"Result count: {len(result)}",
+        f"Sample grouped results: {format_metrics(result, limit=3)}",
+        "\n",
+    ])
     
     return result
 
@@ -190,20 +235,24 @@ def test_chained_transformations(metrics: List[mq.Metric]):
     # Chain transformations
     result = mq.transform(metrics, [filter_transformation, agg_transformation])
     
-    print("TEST CASE 5: Chained transformations")
-    print(f"Original count: {len(metrics)}")
-    print(f"Result count: {len(result)}")
-    print("Sample results:", format_metrics(result[:3]))
-    print("\n")
+    _emit([
+        "TEST CASE 5: Chained transformations",
+        f"Original count: {len(metrics)}",
+        f"Result count: {len(result)}",
+        f"Sample results: {format_metrics(result, limit=3)}",
+        "\n",
+    ])
     
     return result
 
 # Main execution
 if __name__ == "__main__":
+    import json
+    
     # Load test data
     try:
-        with open("test_data.json", "r") as f:
-            test_data = json.load(f)
+        with open("test_data.json", "rb") as f:
+            test_data = orjson.loads(f.read()) if orjson is not None else json.load(f)
     except FileNotFoundError:
         print("Could not find test_data.json. Please run generate_test_data.py first.")
         exit(1)
@@ -17,6 +17,20 @@ except ImportError as e:
     print(f"Error importing from metric_query_library: {e}")
     sys.exit(1)
 
+def _emit(heading, columns):
+    """Print a heading followed by one line per metric, in a single write
+
+    Takes the (values, timestamps, labels) columns of a pipeline result, so
+    no metric attributes are read one at a time.
+    """
+    values, timestamps, labels = columns
+    lines = [heading]
+    lines.extend(
+        f"Label: {label}, Value: {value}, Timestamp: {timestamp}"
+        for value, timestamp, label in zip(values.tolist(), timestamps.tolist(), labels)
+    )
+    sys.stdout.write("\n".join(lines) + "\n")
+
 def test_label_filtering():
     """Test the label filtering capabilities"""
     
@@ -40,67 +54,51 @@ def test_label_filtering():
         Metric(value=30, timestamp=1614556920, label="disk_io"),
     ]
     
+    # Set up one pipeline over the metrics; each test runs its operations
+    # in a single fused call, leaving the pipeline itself unchanged
+    pipeline = MetricPipeline(metrics)
+    
     # Print all metrics
-    print("\nAll metrics:")
-    for m in metrics:
-        print(f"Label: {m.label}, Value: {m.value}, Timestamp: {m.timestamp}")
+    _emit("\nAll metrics:", pipeline.execute_columns())
     
     # Test 1: Filter by exact label
     print("\nTest 1: Filter metrics with label 'cpu_usage'")
-    pipeline = MetricPipeline(metrics)
-    result = pipeline.filter_by_label("label_eq", "cpu_usage").execute()
+    result = pipeline.execute_columns([("filter_by_label", "label_eq", "cpu_usage")])
     
-    print("\nResult (cpu_usage metrics only):")
-    for m in result:
-        print(f"Label: {m.label}, Value: {m.value}, Timestamp: {m.timestamp}")
+    _emit("\nResult (cpu_usage metrics only):", result)
     
     # Test 2: Filter by multiple labels
     print("\nTest 2: Filter metrics with labels in ['cpu_usage', 'memory_usage']")
-    pipeline = MetricPipeline(metrics)
-    result = pipeline.filter_by_labels("label_in", ["cpu_usage", "memory_usage"]).execute()
+    result = pipeline.execute_columns([("filter_by_labels", "label_in", ["cpu_usage", "memory_usage"])])
     
-    print("\nResult (cpu_usage and memory_usage metrics):")
-    for m in result:
-        print(f"Label: {m.label}, Value: {m.value}, Timestamp: {m.timestamp}")
+    _emit("\nResult (cpu_usage and memory_usage metrics):", result)
     
     # Test 3: Filter by label and then apply a value filter
     print("\nTest 3: Filter cpu_usage metrics with value > 85")
-    pipeline = MetricPipeline(metrics)
-    # First filter by label
-    pipeline = pipeline.filter_by_label("label_eq", "cpu_usage")
-    # Then filter by value (using the filter method with gt type)
-    pipeline = pipeline.filter("gt", 85)
-    result = pipeline.execute()
+    result = pipeline.execute_columns([
+        ("filter_by_label", "label_eq", "cpu_usage"),
+        ("filter", "gt", 85),
+    ])
     
-    print("\nResult (cpu_usage metrics with value > 85):")
-    for m in result:
-        print(f"Label: {m.label}, Value: {m.value}, Timestamp: {m.timestamp}")
+    _emit("\nResult (cpu_usage metrics with value > 85):", result)
     
     # Test 4: Filter by label and then apply aggregation
     print("\nTest 4: Get average of memory_usage metrics")
-    pipeline = MetricPipeline(metrics)
-    # First filter by label
-    pipeline = pipeline.filter_by_label("label_eq", "memory_usage")
-    # Then aggregate
-    pipeline = pipeline.aggregate("avg")
-    result = pipeline.execute()
+    result = pipeline.execute_columns([
+        ("filter_by_label", "label_eq", "memory_usage"),
+        ("aggregate", "avg"),
+    ])
     
-    print("\nResult (average of memory_usage metrics):")
-    for m in result:
-        print(f"Label: {m.label}, Value: {m.value}, Timestamp: {m.timestamp}")
+    _emit("\nResult (average of memory_usage metrics):", result)
     
     # Test 5: Filter by label and then group by time
     print("\nTest 5: Group disk_io metrics by minute and sum")
-    pipeline = MetricPipeline(metrics)
-    # First filter by label
-    pipeline = pipeline.filter_by_label("label_eq", "disk_io")
-    # Then group by minute and sum
-    pipeline = pipeline.group_by_time("minute", "sum")
-    result = pipeline.execute()
+    result = pipeline.execute_columns([
+        ("filter_by_label", "label_eq", "disk_io"),
+        ("group_by_time", "minute", "sum"),
+    ])
     
-    print("\nResult (disk_io metrics grouped by minute and summed):")
-    for m in result:
-        print(f"Label: {m.label}, Value: {m.value}, Timestamp: {m.timestamp}")
+    _emit("\nResult (disk_io metrics grouped by minute and summed):", result)
 
 if __name__ == "__main__":
     test_label_filtering()
\ No newline at end of file
@@ -0,0 +1,23 @@
+"""
+Expected results for the metric tests.
+
+Sums and averages are computed with NumPy straight from the fixture
+metrics, independently of metric_query_library, so that a test never
+checks the library against itself.
+"""
+from typing import List
+import numpy as np
+
+def _values(metrics: List) -> np.ndarray:
+    """Extract the values of metrics into an int64 array"""
+    return np.fromiter((m.value for m in metrics), dtype=np.int64, count=len(metrics))
+
+def sum_values(metrics: List) -> int:
+    """Sum the values of metrics"""
+    return int(np.sum(_values(metrics)))
+
+def avg_values(metrics: List) -> int:
+    """Average the values of metrics, rounding toward zero like the Rust aggregations"""
+    total = sum_values(metrics)
+    quotient = abs(total) // len(metrics)
+    return quotient if total >= 0 else -quotient
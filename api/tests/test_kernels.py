@@ -0,0 +1,56 @@
+import pytest
+import sys
+import os
+import numpy as np
+
+# Add the parent directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# The compiled kernels only exist when Numba is installed
+pytest.importorskip("numba")
+
+from models import kernels
+
+def _expected(buckets, values, aggregation):
+    """Group with the NumPy segment reductions the kernels replace"""
+    order = np.argsort(buckets, kind='stable')
+    buckets = buckets[order]
+    values = values[order].astype(np.int64)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    return buckets[starts], kernels.AGG_FNS[aggregation](values, starts)
+
+@pytest.fixture(scope="module")
+def stream():
+    """Three days of unordered timestamps with positive and negative values"""
+    rng = np.random.default_rng(0)
+    timestamps = rng.integers(0, 3 * 86400, size=5000, dtype=np.int64)
+    values = rng.integers(-1000, 1000, size=5000, dtype=np.int64)
+    return timestamps, values
+
+@pytest.mark.parametrize("bucket_seconds", [60, 3600, 86400])
+def test_bucketizers(stream, bucket_seconds):
+    """Test the specialized bucketizers against the generic one"""
+    timestamps, _ = stream
+    expected = (timestamps // bucket_seconds) * bucket_seconds
+    np.testing.assert_array_equal(kernels.BUCKETIZERS[bucket_seconds](timestamps), expected)
+    np.testing.assert_array_equal(kernels.bucketize(timestamps, bucket_seconds), expected)
+
+@pytest.mark.parametrize("kernel", ["group_by_bucket_i64", "group_by_bucket_i64_parallel"])
+@pytest.mark.parametrize("dtype", [np.int32, np.int64])
+@pytest.mark.parametrize("aggregation", ["sum", "avg", "min", "max"])
+@pytest.mark.parametrize("ordered", [True, False])
+def test_group_by_bucket(stream, kernel, dtype, aggregation, ordered):
+    """Test the grouping kernels against the NumPy reductions"""
+    timestamps, values = stream
+    if ordered:
+        order = np.argsort(timestamps, kind='stable')
+        timestamps, values = timestamps[order], values[order]
+    buckets = kernels.BUCKETIZERS[3600](timestamps)
+    values = values.astype(dtype)
+
+    keys, result = getattr(kernels, kernel)(buckets, values, kernels.AGGREGATION_CODES[aggregation])
+    expected_keys, expected = _expected(buckets, values, aggregation)
+
+    assert result.dtype == np.int64
+    np.testing.assert_array_equal(keys, expected_keys)
+    np.testing.assert_array_equal(result, expected)
@@ -1,22 +1,31 @@
 import pytest
+import operator
 import sys
 import os
 from datetime import datetime, timedelta
 import time
+import numpy as np
 
 # Add the parent directory to sys.path for imports
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import metric_query_library as mq
+from _expected import avg_values, sum_values
 from metric_query_library.type_defs import (
     FilterSpec, TransformationSpec, MetricDict, LabeledMetricDict
 )
 
 # Test fixtures
-@pytest.fixture
-def sample_metrics():
+@pytest.fixture(scope="session")
+def now_ts():
+    """Current Unix timestamp, shared by every test so they agree on the time"""
+    return int(datetime.now().timestamp())
+
+# Metric fixtures; module scoped since no test modifies the metrics
+@pytest.fixture(scope="module")
+def sample_metrics(now_ts):
     """Create a set of sample metrics for testing"""
-    now = int(datetime.now().timestamp())
+    now = now_ts
     
     # Create metrics with different times and values
     return [
@@ -27,10 +36,18 @@ def sample_metrics():
         mq.Metric(value=50, timestamp=now - 3600 * 24 * 2),  # 2 days ago
     ]
 
-@pytest.fixture
-def sample_labeled_metrics():
+@pytest.fixture(scope="module")
+def sample_metrics_soa(sample_metrics):
+    """The sample metrics as value and timestamp columns"""
+    return {
+        "values": np.fromiter((m.value for m in sample_metrics), dtype=np.int64, count=len(sample_metrics)),
+        "timestamps": np.fromiter((m.timestamp for m in sample_metrics), dtype=np.int64, count=len(sample_metrics)),
+    }
+
+@pytest.fixture(scope="module")
+def sample_labeled_metrics(now_ts):
     """Create a set of sample labeled metrics for testing"""
-    now = int(datetime.now().timestamp())
+    now = now_ts
     
     # Create metrics with different labels, times, and values
     return [
@@ -42,17 +59,17 @@ def sample_labeled_metrics():
     ]
 
 # Basic tests for metrics
-def test_create_metric():
+def test_create_metric(now_ts):
     """Test creating a metric"""
-    now = int(datetime.now().timestamp())
+    now = now_ts
     metric = mq.Metric(value=42, timestamp=now)
     
     assert metric.value == 42
     assert metric.timestamp == now
 
-def test_create_labeled_metric():
+def test_create_labeled_metric(now_ts):
     """Test creating a labeled metric"""
-    now = int(datetime.now().timestamp())
+    now = now_ts
     metric = mq.LabeledMetric(label="cpu", value=42, timestamp=now)
     
     assert metric.label == "cpu"
@@ -60,29 +77,18 @@ def test_create_labeled_metric():
     assert metric.timestamp == now
 
 # Filter tests
-def test_filter_greater_than(sample_metrics):
-    """Test filtering metrics with value greater than a threshold"""
-    pipeline = mq.create_pipeline(sample_metrics)
-    result = pipeline.greater_than(25).execute()
-    
-    assert len(result) == 3
-    assert all(m.value > 25 for m in result)
-
-def test_filter_less_than(sample_metrics):
-    """Test filtering metrics with value less than a threshold"""
+@pytest.mark.parametrize("method,threshold,expected_count,predicate", [
+    ("greater_than", 25, 3, operator.gt),
+    ("less_than", 25, 2, operator.lt),
+    ("equal_to", 30, 1, operator.eq),
+])
+def test_filter(sample_metrics, method, threshold, expected_count, predicate):
+    """Test filtering metrics by comparing their value with a threshold"""
     pipeline = mq.create_pipeline(sample_metrics)
-    result = pipeline.less_than(25).execute()
+    result = getattr(pipeline, method)(threshold).execute()
     
-    assert len(result) == 2
-    assert all(m.value < 25 for m in result)
-
-def test_filter_equal_to(sample_metrics):
-    """Test filtering metrics with value equal to a threshold"""
-    pipeline = mq.create_pipeline(sample_metrics)
-    result = pipeline.equal_to(30).execute()
-    
-    assert len(result) == 1
-    assert result[0].value == 30
+    assert len(result) == expected_count
+    assert all(predicate(m.value, threshold) for m in result)
 
 # Aggregation tests
 def test_sum_aggregation(sample_metrics):
@@ -91,14 +97,14 @@ def test_sum_aggregation(sample_metrics):
     result = pipeline.sum().execute()
     
     assert len(result) == 1
-    assert result[0].value == sum(m.value for m in sample_metrics)
+    assert result[0].value == sum_values(sample_metrics)
 
 def test_average_aggregation(sample_metrics):
     """Test average aggregation of metric values"""
     pipeline = mq.create_pipeline(sample_metrics)
     result = pipeline.average().execute()
     
-    expected_avg = sum(m.value for m in sample_metrics) // len(sample_metrics)
+    expected_avg = avg_values(sample_metrics)
     assert len(result) == 1
     assert result[0].value == expected_avg
 
@@ -112,8 +118,8 @@ def test_group_by_hour(sample_metrics):
     assert 1 <= len(result) <= 5
     
     # Sum of all values should be the same before and after grouping
-    original_sum = sum(m.value for m in sample_metrics)
-    grouped_sum = sum(m.value for m in result)
+    original_sum = sum_values(sample_metrics)
+    grouped_sum = mq.sum_values(result)
     assert original_sum == grouped_sum
 
 def test_group_by_day(sample_metrics):
@@ -125,12 +131,12 @@ def test_group_by_day(sample_metrics):
     assert 1 <= len(result) <= 3
     
     # Sum of all values should be the same before and after grouping
-    original_sum = sum(m.value for m in sample_metrics)
-    grouped_sum = sum(m.value for m in result)
+    original_sum = sum_values(sample_metrics)
+    grouped_sum = mq.sum_values(result)
     assert original_sum == grouped_sum
 
 # Chained transformations tests
-def test_filter_then_aggregate(sample_metrics):
+def test_filter_then_aggregate(sample_metrics, sample_metrics_soa):
     """Test filtering metrics then aggregating results"""
     pipeline = mq.create_pipeline(sample_metrics)
     result = pipeline.greater_than(20).sum().execute()
@@ -138,21 +144,23 @@ def test_filter_then_aggregate(sample_metrics):
     assert len(result) == 1
     
     # Sum should include only values > 20
-    expected_sum = sum(m.value for m in sample_metrics if m.value > 20)
+    values = sample_metrics_soa["values"]
+    expected_sum = values[values > 20].sum()
     assert result[0].value == expected_sum
 
-def test_filter_then_group_by_hour(sample_metrics):
+def test_filter_then_group_by_hour(sample_metrics, sample_metrics_soa):
     """Test filtering metrics then grouping by hour"""
     pipeline = mq.create_pipeline(sample_metrics)
     result = pipeline.greater_than(20).group_by_hour().execute()
     
     # Grouped metrics should all have values > 20
-    filtered_metrics = [m for m in sample_metrics if m.value > 20]
-    assert len(result) <= len(filtered_metrics)
+    values = sample_metrics_soa["values"]
+    filtered_values = values[values > 20]
+    assert len(result) <= len(filtered_values)
     
     # Sum of grouped values should equal sum of filtered values
-    filtered_sum = sum(m.value for m in filtered_metrics)
-    grouped_sum = sum(m.value for m in result)
+    filtered_sum = filtered_values.sum()
+    grouped_sum = mq.sum_values(result)
     assert filtered_sum == grouped_sum
 
 # Label operations tests
@@ -187,11 +195,11 @@ def test_label_filter_with_pipeline(sample_labeled_metrics):
     
     # Sum should include only cpu metrics
     cpu_metrics = [m for m in sample_labeled_metrics if m.label == "cpu"]
-    expected_sum = sum(m.value for m in cpu_metrics)
+    expected_sum = sum_values(cpu_metrics)
     assert result[0].value == expected_sum
 
 # Legacy API tests
-def test_legacy_transform_api(sample_metrics):
+def test_legacy_transform_api(sample_metrics, sample_metrics_soa):
     """Test the legacy transform API for backward compatibility"""
     # Create transformations in the legacy format
     transformations = [
@@ -204,10 +212,11 @@ def test_legacy_transform_api(sample_metrics):
     assert len(result) == 1
     
     # Result should be sum of values > 20
-    expected_sum = sum(m.value for m in sample_metrics if m.value > 20)
+    values = sample_metrics_soa["values"]
+    expected_sum = values[values > 20].sum()
     assert result[0].value == expected_sum
 
-def test_transform_to_dicts(sample_metrics):
+def test_transform_to_dicts(sample_metrics, sample_metrics_soa):
     """Test transforming metrics and converting results to dictionaries"""
     transformations = [
         {"filter": {"type": "gt", "value": 20}},
@@ -221,14 +230,14 @@ def test_transform_to_dicts(sample_metrics):
     assert "timestamp" in result[0]
     
     # Result should be sum of values > 20
-    expected_sum = sum(m.value for m in sample_metrics if m.value > 20)
+    values = sample_metrics_soa["values"]
+    expected_sum = values[values > 20].sum()
     assert result[0]["value"] == expected_sum
 
 # Integration tests
-def test_complex_pipeline(sample_metrics):
+def test_complex_pipeline(sample_metrics, now_ts):
     """Test a complex pipeline with multiple operations"""
-    # Get current timestamp
-    now = int(datetime.now().timestamp())
+    now = now_ts
     
     # Create a pipeline that:
     # 1. Filters metrics from the last day
@@ -0,0 +1,85 @@
+import pytest
+import sys
+import os
+import json
+
+# Add the parent directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Skip compiling kernels at startup; the tests only exercise request handling
+os.environ.setdefault('WARMUP', '0')
+
+from app import app
+
+@pytest.fixture(scope="module")
+def client():
+    """Test client for the API"""
+    return app.test_client()
+
+def _post(client, url, body):
+    """POST a JSON body, serialized here so that out-of-range ints reach the server"""
+    return client.post(url, data=json.dumps(body), content_type='application/json')
+
+# JSON provider tests
+def test_json_provider_encodes_large_ints():
+    """Test that integers beyond 64 bits still serialize, as with Flask's default provider"""
+    assert json.loads(app.json.dumps({"value": 2**70})) == {"value": 2**70}
+
+# Input validation tests
+@pytest.mark.parametrize("url,body,message", [
+    ("/labeled-metrics/", {"label": "x", "value": 2**64, "timestamp": 100},
+     "Value must fit in a 64-bit signed integer"),
+    ("/labeled-metrics/", {"label": "x", "value": -2**63 - 1},
+     "Value must fit in a 64-bit signed integer"),
+    ("/metrics/", {"value": 2**63},
+     "Value must fit in a 64-bit signed integer"),
+    ("/metrics/", {"value": 1, "timestamp": 2**63},
+     "Timestamp must fit in a 64-bit signed integer"),
+    ("/metrics/bulk", [{"value": 2**63}],
+     "Value must fit in a 64-bit signed integer"),
+])
+def test_rejects_values_outside_int64(client, url, body, message):
+    """Test that integers too large for the metric columns get a JSON 400"""
+    response = _post(client, url, body)
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": message}
+
+@pytest.mark.parametrize("body", [
+    {"labels": ["new-label-a"], "values": [1], "timestamps": [-1]},
+    {"labels": ["new-label-b"], "values": [1], "timestamps": [2**62]},
+    {"labels": ["new-label-c"], "values": [1, 2], "timestamps": [1]},
+])
+def test_rejected_bulk_upload_stores_no_labels(client, body):
+    """Test that a rejected bulk upload leaves the label dictionary unchanged"""
+    from models.store import labeled_metrics_store
+    labels = list(labeled_metrics_store.labels_dict)
+
+    response = _post(client, "/labeled-metrics/bulk", body)
+
+    assert response.status_code == 400
+    assert list(labeled_metrics_store.labels_dict) == labels
+
+# Pipeline tests
+def test_pipeline_aggregate_of_nothing(client):
+    """Test that aggregating metrics no filter matched is an error, not the whole store"""
+    response = _post(client, "/metrics/pipeline", {"pipeline": [
+        {"operation": "greater_than", "value": 2**63 - 1},
+        {"operation": "sum"},
+    ]})
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Error executing pipeline: Operation on empty metric stream"}
+
+@pytest.mark.parametrize("step,message", [
+    ({"operation": "filter", "type": "gt"}, "Filter operation requires type and value (step 1)"),
+    ({"operation": "greater_than"}, "greater_than operation requires value (step 1)"),
+    ({"operation": "group_by", "aggregation": "sum"}, "group_by operation requires time_grouping and aggregation (step 1)"),
+    ({"type": "sum"}, "Missing operation in pipeline step 1"),
+])
+def test_pipeline_malformed_step(client, step, message):
+    """Test that a malformed step is reported with its index"""
+    response = _post(client, "/metrics/pipeline", {"pipeline": [{"operation": "sum"}, step]})
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": message}
@@ -1,4 +1,4 @@
 """
 Utility package for the Metric Query API.
 """
-from utils.utils import load_test_data
\ No newline at end of file
+from utils.utils import load_test_data, load_test_columns, dumps_json, json_response, error_response, load_json_body, stream_json_array, wants_stream, chunked, ORJSONProvider
\ No newline at end of file
@@ -3,59 +3,300 @@ Utility functions for the Metric Query API.
 """
 import os
 import json
+import zipfile
+from functools import lru_cache
 import metric_query_library as mq
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional
+import numpy as np
+from flask import current_app, request
+from flask.json.provider import DefaultJSONProvider
 
-def load_test_data(file_path: Optional[str] = None) -> Dict[str, List[mq.Metric]]:
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def dumps_json(obj: Any) -> bytes:
     """
-    Load test data from a JSON file.
+    Serialize an object to compact JSON bytes.
+    
+    Uses orjson when it is installed, which also serializes NumPy arrays
+    and scalars, and falls back to the standard library json module
+    otherwise.
     
     Args:
-        file_path: Path to the test data file. If None, tries to locate test_data.json
-                  relative to the root of the project.
+        obj: JSON-serializable object
     
     Returns:
-        Dictionary containing 'metrics' and 'labeled_metrics' lists
+        UTF-8 encoded JSON document
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            # orjson only encodes 64-bit integers; fall through to the json module
+            pass
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson.
+
+    Keeps the behaviour of the default provider (sorted keys, compact or
+    indented output, the same fallback serializer) while doing the actual
+    encoding and decoding with orjson. Only usable when orjson is installed.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=kwargs.get('default', self.default), option=option).decode('utf-8')
+        except TypeError:
+            # orjson only encodes 64-bit integers; the default provider has no such limit
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+def load_json_body() -> Any:
+    """
+    Parse the JSON body of the current request.
+    
+    Reads the raw body once, without Flask's mimetype check or its cached
+    copy, and decodes it with orjson when it is installed.
+    
+    Returns:
+        The decoded document, or None if the body is empty
+    
+    Raises:
+        ValueError: If the body is not valid JSON
+    """
+    body = request.get_data(cache=False)
+    if not body:
+        return None
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+def json_response(obj: Any, status: int = 200):
+    """
+    Build a JSON response without going through Flask's jsonify.
+    
+    Args:
+        obj: JSON-serializable object, or already serialized JSON bytes
+        status: HTTP status code
+    
+    Returns:
+        A response object with an application/json mimetype
+    """
+    body = obj if isinstance(obj, bytes) else dumps_json(obj)
+    return current_app.response_class(body, status=status, mimetype='application/json')
+
+@lru_cache(maxsize=256)
+def _error_body(message: str) -> bytes:
+    """Serialized error document, cached since most messages repeat"""
+    return dumps_json({"error": message})
+
+def error_response(message: str, status: int = 400):
+    """
+    Build a JSON error response of the form {"error": message}.
+    
+    Args:
+        message: Error message
+        status: HTTP status code
+    
+    Returns:
+        A response object with an application/json mimetype
+    """
+    return current_app.response_class(_error_body(message), status=status, mimetype='application/json')
+
+def stream_json_array(chunks: Iterable[List[Any]], status: int = 200):
+    """
+    Build a response that streams a JSON array chunk by chunk.
+    
+    Each chunk is serialized and sent as it is produced, so the whole
+    document never has to be held in memory at once.
+    
+    Args:
+        chunks: Iterable of lists of JSON-serializable items
+        status: HTTP status code
+    
+    Returns:
+        A streamed response with an application/json mimetype
+    """
+    def generate() -> Iterator[bytes]:
+        yield b'['
+        first = True
+        for chunk in chunks:
+            if not chunk:
+                continue
+            body = b','.join(dumps_json(item) for item in chunk)
+            yield body if first else b',' + body
+            first = False
+        yield b']'
+    
+    return current_app.response_class(generate(), status=status, mimetype='application/json')
+
+def wants_stream() -> bool:
+    """Whether the client asked for a streamed response with ?stream=1"""
+    return request.args.get('stream') == '1'
+
+def chunked(rows: List[Any], chunk_size: int = 1000) -> Iterator[List[Any]]:
+    """Split a result list into chunks for streaming"""
+    return (rows[start:start + chunk_size] for start in range(0, len(rows), chunk_size))
+
+def _default_test_data_path() -> str:
+    """Path of test_data.json in the API directory"""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(os.path.dirname(current_dir), "test_data.json")
+
+def _int_column(items: List[Dict[str, Any]], key: str) -> np.ndarray:
+    """Collect one integer field of the test data items into an int64 array"""
+    return np.fromiter((item[key] for item in items), dtype=np.int64, count=len(items))
+
+def _timestamp_seconds_column(items: List[Dict[str, Any]]) -> np.ndarray:
+    """Timestamps of the test data items, converted from milliseconds to seconds"""
+    try:
+        timestamps = _int_column(items, "timestamp")
+    except KeyError:
+        # Some items carry timestamp_ms instead; look each one up
+        timestamps = np.fromiter(
+            (item["timestamp"] if "timestamp" in item else item.get("timestamp_ms", 0) for item in items),
+            dtype=np.int64,
+            count=len(items)
+        )
+    np.floor_divide(timestamps, 1000, out=timestamps)
+    return timestamps
+
+# Columns saved in the .npz cache of the test data
+_TEST_COLUMNS = ("values", "timestamps", "labeled_labels", "labeled_values", "labeled_timestamps")
+
+def _test_columns_cache_path(file_path: str) -> Optional[str]:
+    """
+    Path of the .npz cache for a test data file.
+    
+    The cache goes next to the JSON file unless the TEST_DATA_CACHE_DIR
+    environment variable names another directory; setting it to an empty
+    string disables the cache.
+    """
+    cache_dir = os.environ.get('TEST_DATA_CACHE_DIR')
+    if cache_dir == '':
+        return None
+    name = os.path.splitext(os.path.basename(file_path))[0] + ".npz"
+    return os.path.join(cache_dir or os.path.dirname(file_path), name)
+
+def _read_test_columns_cache(cache_path: str, file_path: str) -> Optional[Dict[str, np.ndarray]]:
+    """The cached columns, or None if the cache is missing, stale, corrupt or incomplete"""
+    try:
+        if os.path.getmtime(cache_path) < os.path.getmtime(file_path):
+            return None
+        with np.load(cache_path) as cached:
+            if not set(_TEST_COLUMNS).issubset(cached.files):
+                # Written by a version with a different set of columns
+                return None
+            return {name: cached[name] for name in _TEST_COLUMNS}
+    except (OSError, ValueError, EOFError, zipfile.BadZipFile):
+        return None
+
+def load_test_columns(file_path: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """
+    Load the test data as NumPy columns.
+    
+    The JSON file is parsed once and its columns are saved as a .npz file,
+    next to it or in TEST_DATA_CACHE_DIR; later calls, including from new
+    processes, load that file instead as long as it is newer than the JSON
+    and holds every column.
+    
+    Args:
+        file_path: Path to the test data file. If None, uses test_data.json
+                  in the API directory.
+    
+    Returns:
+        Dictionary with 'values' and 'timestamps' for the basic metrics, and
+        'labeled_labels', 'labeled_values' and 'labeled_timestamps' for the
+        labeled metrics
     
     Raises:
         FileNotFoundError: If the test data file cannot be found
     """
     if file_path is None:
-        # Try to find test_data.json in the project root
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        api_dir = os.path.dirname(current_dir)
-        file_path = os.path.join(api_dir, "test_data.json")
+        file_path = _default_test_data_path()
+    cache_path = _test_columns_cache_path(file_path)
+    
+    if cache_path is not None:
+        columns = _read_test_columns_cache(cache_path, file_path)
+        if columns is not None:
+            return columns
     
     try:
-        with open(file_path, "r") as f:
-            test_data = json.load(f)
-            
-        # Convert JSON data to Metric objects
-        metrics = [
-            mq.Metric(
-                value=item["value"],
-                timestamp=item["timestamp"] // 1000 if "timestamp" in item else item.get("timestamp_ms", 0) // 1000
-            )
-            for item in test_data.get("basicMetrics", [])
-        ]
-        
-        # Convert JSON data to LabeledMetric objects
-        labeled_metrics = [
-            mq.LabeledMetric(
-                label=item["label"],
-                value=item["value"],
-                timestamp=item["timestamp"] // 1000 if "timestamp" in item else item.get("timestamp_ms", 0) // 1000
-            )
-            for item in test_data.get("extendedMetrics", [])
-        ]
-        
-        return {
-            "metrics": metrics,
-            "labeled_metrics": labeled_metrics
-        }
+        with open(file_path, "rb") as f:
+            test_data = orjson.loads(f.read()) if orjson is not None else json.load(f)
     except FileNotFoundError:
         raise FileNotFoundError(f"Test data file not found: {file_path}")
     except json.JSONDecodeError:
         raise ValueError(f"Invalid JSON in test data file: {file_path}")
-    except Exception as e:
-        raise Exception(f"Error loading test data: {str(e)}")
\ No newline at end of file
+    
+    basic = test_data.get("basicMetrics", [])
+    extended = test_data.get("extendedMetrics", [])
+    columns = {
+        "values": _int_column(basic, "value"),
+        "timestamps": _timestamp_seconds_column(basic),
+        "labeled_labels": np.array([item["label"] for item in extended], dtype=str),
+        "labeled_values": _int_column(extended, "value"),
+        "labeled_timestamps": _timestamp_seconds_column(extended),
+    }
+    
+    if cache_path is not None:
+        # Write to a temporary file first so other processes never see a partial cache
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp.npz"
+        try:
+            np.savez(tmp_path, **columns)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+    return columns
+
+@lru_cache(maxsize=4)
+def _load_test_data(file_path: str, mtime: float) -> Dict[str, List[mq.Metric]]:
+    """Build the test metrics of a file, cached per path and modification time"""
+    # Build the metrics in bulk from the columns rather than one row at a time
+    columns = load_test_columns(file_path)
+    return {
+        "metrics": mq.Metric.from_arrays(columns["values"], columns["timestamps"]),
+        "labeled_metrics": mq.LabeledMetric.from_arrays(
+            columns["labeled_labels"].tolist(),
+            columns["labeled_values"],
+            columns["labeled_timestamps"]
+        )
+    }
+
+def load_test_data(file_path: Optional[str] = None) -> Dict[str, List[mq.Metric]]:
+    """
+    Load test data from a JSON file.
+    
+    The file is read through load_test_columns, so its .npz cache is used
+    when it is up to date. The metrics are built once per file and shared
+    by later calls until the file changes, so callers must not modify the
+    returned dictionary or its lists.
+    
+    Args:
+        file_path: Path to the test data file. If None, tries to locate test_data.json
+                  relative to the root of the project.
+    
+    Returns:
+        Dictionary containing 'metrics' and 'labeled_metrics' lists
+    
+    Raises:
+        FileNotFoundError: If the test data file cannot be found
+        ValueError: If the test data file is not valid JSON
+    """
+    file_path = os.path.realpath(file_path if file_path is not None else _default_test_data_path())
+    try:
+        mtime = os.path.getmtime(file_path)
+    except OSError:
+        raise FileNotFoundError(f"Test data file not found: {file_path}")
+    return _load_test_data(file_path, mtime)
@@ -17,7 +17,9 @@ use plugin_impls::{
     py_create_filter, py_create_aggregation, py_create_time_grouping,
     py_create_label_filter, py_create_label_in_filter
 };
+use pyo3::exceptions::PyOverflowError;
 use pyo3::prelude::*;
+use pyo3::types::PyList;
 
 // Legacy filter enum for backward compatibility
 #[pyclass]
@@ -208,6 +210,25 @@ pub fn transform(py: Python<'_>, metrics: Vec<Metric>, transformations: Vec<Tran
     apply_transformations(py, &metrics, &transformations)
 }
 
+/// Sums the values of a list of metrics in a single call.
+///
+/// Accepts both `Metric` and `LabeledMetric` items, so callers need not
+/// fetch each value through Python attribute access.
+#[pyfunction]
+pub fn sum_values(metrics: &Bound<'_, PyList>) -> PyResult<i64> {
+    let mut total: i64 = 0;
+    for item in metrics.iter() {
+        let value = match item.downcast::<Metric>() {
+            Ok(metric) => metric.borrow().value,
+            Err(_) => item.downcast::<LabeledMetric>()?.borrow().value,
+        };
+        total = total
+            .checked_add(value)
+            .ok_or_else(|| PyOverflowError::new_err("Sum of metric values overflows a 64-bit integer"))?;
+    }
+    Ok(total)
+}
+
 /// Creates a new metric pipeline with the given metrics.
 /// This is part of the new fluent API.
 #[pyfunction]
@@ -231,6 +252,7 @@ fn metric_query_library(_py: Python, m: &Bound<'_, PyModule>) -> PyResult<()> {
     
     // Register legacy functions and types for backward compatibility
     m.add_function(wrap_pyfunction!(transform, m)?)?;
+    m.add_function(wrap_pyfunction!(sum_values, m)?)?;
     m.add_class::<Metric>()?;
     m.add_class::<LabeledMetric>()?;
     m.add_class::<Filter>()?;
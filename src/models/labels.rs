@@ -0,0 +1,99 @@
+use pyo3::exceptions::PyKeyError;
+use pyo3::prelude::*;
+use std::collections::HashMap;
+use std::sync::{Arc, OnceLock, PoisonError, RwLock, RwLockReadGuard};
+
+/// Integer id of an interned label.
+pub type LabelId = u32;
+
+/// Dictionary that interns metric labels as integer ids.
+///
+/// Labels are few and repeated across many metrics, so each metric stores a
+/// small id instead of its own string, and label filters compare integers.
+#[derive(Debug, Default)]
+pub struct LabelDict {
+    ids: HashMap<Arc<str>, LabelId>,
+    names: Vec<Arc<str>>,
+}
+
+impl LabelDict {
+    /// Create a new empty dictionary
+    pub fn new() -> Self {
+        Self::default()
+    }
+
+    /// Get the id of a label, if it has been interned
+    pub fn get_id(&self, label: &str) -> Option<LabelId> {
+        self.ids.get(label).copied()
+    }
+
+    /// Get the id of a label, interning it if it is new
+    pub fn intern(&mut self, label: &str) -> LabelId {
+        if let Some(id) = self.get_id(label) {
+            return id;
+        }
+        let id = self.names.len() as LabelId;
+        let name: Arc<str> = Arc::from(label);
+        self.names.push(name.clone());
+        self.ids.insert(name, id);
+        id
+    }
+
+    /// Get the label of an id
+    pub fn name(&self, id: LabelId) -> Option<&str> {
+        self.names.get(id as usize).map(|name| name.as_ref())
+    }
+}
+
+// Global dictionary
+// Shared across threads, since metrics may be created on one thread and read on another
+static LABELS: OnceLock<RwLock<LabelDict>> = OnceLock::new();
+
+fn labels() -> &'static RwLock<LabelDict> {
+    LABELS.get_or_init(|| RwLock::new(LabelDict::new()))
+}
+
+// The dictionary is append-only, so a panic while it was held cannot leave it
+// half updated and a poisoned lock is safe to keep using
+fn read_labels() -> RwLockReadGuard<'static, LabelDict> {
+    labels().read().unwrap_or_else(PoisonError::into_inner)
+}
+
+fn unknown_label_id(id: LabelId) -> PyErr {
+    PyKeyError::new_err(format!("Unknown label id: {}", id))
+}
+
+/// Get the id of a label in the global dictionary, interning it if it is new
+///
+/// Only used for labels stored on metrics; query labels go through
+/// `lookup_label` so that filtering never grows the dictionary.
+pub fn intern_label(label: &str) -> LabelId {
+    if let Some(id) = read_labels().get_id(label) {
+        return id;
+    }
+    labels().write().unwrap_or_else(PoisonError::into_inner).intern(label)
+}
+
+/// Get the id of a label in the global dictionary, if any metric has used it
+pub fn lookup_label(label: &str) -> Option<LabelId> {
+    read_labels().get_id(label)
+}
+
+/// Get the label of an id in the global dictionary
+pub fn label_name(id: LabelId) -> PyResult<String> {
+    read_labels()
+        .name(id)
+        .map(str::to_string)
+        .ok_or_else(|| unknown_label_id(id))
+}
+
+/// Get the labels of a sequence of optional ids, reading the global dictionary once
+pub fn label_names(ids: impl IntoIterator<Item = Option<LabelId>>) -> PyResult<Vec<Option<String>>> {
+    let labels = read_labels();
+    ids.into_iter()
+        .map(|id| {
+            id.map(|id| labels.name(id).map(str::to_string).ok_or_else(|| unknown_label_id(id)))
+                .transpose()
+        })
+        .collect()
+}
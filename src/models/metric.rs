@@ -1,5 +1,10 @@
+use numpy::PyReadonlyArray1;
+use std::collections::HashMap;
+use pyo3::exceptions::PyValueError;
 use pyo3::prelude::*;
 
+use super::labels::{intern_label, label_name, LabelId};
+
 /// A metric is a single data point that is collected at a specific time.
 ///
 /// # Properties
@@ -15,8 +20,8 @@ pub struct Metric {
     /// The time at which the metric was collected.
     #[pyo3(get, set)]
     pub timestamp: i64,
-    #[pyo3(get, set)]
-    pub label: Option<String>, // Add optional label
+    /// The id of the metric's label in the label dictionary, if it has one.
+    pub label_id: Option<LabelId>,
 }
 
 #[pymethods]
@@ -24,7 +29,39 @@ impl Metric {
     /// Create a new Metric
     #[new]
     pub fn new(value: i64, timestamp: i64, label: Option<String>) -> Self {
-        Self { value, timestamp, label }
+        Self { value, timestamp, label_id: label.as_deref().map(intern_label) }
+    }
+
+    /// The label of the metric, if it has one
+    #[getter]
+    pub fn label(&self) -> PyResult<Option<String>> {
+        self.label_id.map(label_name).transpose()
+    }
+
+    #[setter]
+    pub fn set_label(&mut self, label: Option<String>) {
+        self.label_id = label.as_deref().map(intern_label);
+    }
+
+    /// Create Metrics from value and timestamp columns
+    ///
+    /// The columns are read straight from the NumPy buffers, so building a
+    /// large batch costs no Python calls per metric.
+    #[staticmethod]
+    pub fn from_arrays(
+        values: PyReadonlyArray1<'_, i64>,
+        timestamps: PyReadonlyArray1<'_, i64>,
+    ) -> PyResult<Vec<Self>> {
+        let values = values.as_slice()?;
+        let timestamps = timestamps.as_slice()?;
+        if values.len() != timestamps.len() {
+            return Err(PyValueError::new_err("values and timestamps must have the same length"));
+        }
+        Ok(values
+            .iter()
+            .zip(timestamps)
+            .map(|(&value, &timestamp)| Self { value, timestamp, label_id: None })
+            .collect())
     }
 }
 
@@ -32,9 +69,8 @@ impl Metric {
 #[pyclass]
 #[derive(Debug, Clone)]
 pub struct LabeledMetric {
-    /// The label of the metric (e.g., "cpu", "memory").
-    #[pyo3(get, set)]
-    pub label: String,
+    /// The id of the metric's label (e.g., "cpu", "memory") in the label dictionary.
+    pub label_id: LabelId,
     /// The value of the metric.
     #[pyo3(get, set)]
     pub value: i64,
@@ -48,6 +84,41 @@ impl LabeledMetric {
     /// Create a new LabeledMetric
     #[new]
     pub fn new(label: String, value: i64, timestamp: i64) -> Self {
-        Self { label, value, timestamp }
+        Self { label_id: intern_label(&label), value, timestamp }
+    }
+
+    /// The label of the metric
+    #[getter]
+    pub fn label(&self) -> PyResult<String> {
+        label_name(self.label_id)
+    }
+
+    #[setter]
+    pub fn set_label(&mut self, label: String) {
+        self.label_id = intern_label(&label);
+    }
+
+    /// Create LabeledMetrics from label, value and timestamp columns
+    #[staticmethod]
+    pub fn from_arrays(
+        labels: Vec<String>,
+        values: PyReadonlyArray1<'_, i64>,
+        timestamps: PyReadonlyArray1<'_, i64>,
+    ) -> PyResult<Vec<Self>> {
+        let values = values.as_slice()?;
+        let timestamps = timestamps.as_slice()?;
+        if labels.len() != values.len() || values.len() != timestamps.len() {
+            return Err(PyValueError::new_err("labels, values and timestamps must have the same length"));
+        }
+        // Columns repeat a handful of labels, so intern each one only once
+        let mut ids: HashMap<String, LabelId> = HashMap::new();
+        Ok(labels
+            .into_iter()
+            .zip(values.iter().zip(timestamps))
+            .map(|(label, (&value, &timestamp))| {
+                let label_id = *ids.entry(label).or_insert_with_key(|label| intern_label(label));
+                Self { label_id, value, timestamp }
+            })
+            .collect())
     }
 }
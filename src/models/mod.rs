@@ -1,4 +1,6 @@
+pub mod labels;
 pub mod metric;
 
 pub use metric::Metric;
 pub use metric::LabeledMetric;
+pub use labels::{LabelDict, LabelId};
@@ -3,6 +3,7 @@ use chrono::{DateTime, Timelike, Utc};
 
 use crate::errors::{MetricQueryError, MetricQueryResult};
 use crate::models::Metric;
+use crate::models::labels::{lookup_label, LabelId};
 use crate::plugins::{
     FilterPlugin, AggregationPlugin, TimeGroupingPlugin, 
     with_registry_mut
@@ -144,12 +145,13 @@ impl FilterPlugin for EqualFilter {
 
 #[derive(Clone)]
 pub struct LabelFilter {
-    label: String,
+    // None when no metric has the label, so the filter matches nothing
+    label_id: Option<LabelId>,
 }
 
 impl LabelFilter {
     pub fn new(label: String) -> Self {
-        Self { label }
+        Self { label_id: lookup_label(&label) }
     }
 }
 
@@ -159,10 +161,8 @@ impl FilterPlugin for LabelFilter {
     }
 
     fn apply(&self, metric: &Metric) -> bool {
-        match &metric.label {
-            Some(l) => l == &self.label,
-            None => false, // Don't include unlabeled metrics
-        }
+        // Unlabeled metrics are never included
+        self.label_id.is_some() && metric.label_id == self.label_id
     }
 
     fn clone_box(&self) -> Box<dyn FilterPlugin> {
@@ -173,12 +173,13 @@ impl FilterPlugin for LabelFilter {
 // Example: Filter for metrics where the label is in a given set
 #[derive(Clone)]
 pub struct LabelInFilter {
-    labels: Vec<String>,
+    label_ids: Vec<LabelId>,
 }
 
 impl LabelInFilter {
     pub fn new(labels: Vec<String>) -> Self {
-        Self { labels }
+        // Labels no metric has cannot match, so they are left out
+        Self { label_ids: labels.iter().filter_map(|label| lookup_label(label)).collect() }
     }
 }
 
@@ -188,8 +189,8 @@ impl FilterPlugin for LabelInFilter{
     }
 
     fn apply(&self, metric: &Metric) -> bool {
-        match &metric.label {
-            Some(l) => self.labels.contains(l),
+        match metric.label_id {
+            Some(id) => self.label_ids.contains(&id),
             None => false
         }
     }
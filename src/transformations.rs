@@ -1,8 +1,13 @@
+use numpy::PyArray1;
+use pyo3::exceptions::PyValueError;
 use pyo3::prelude::*;
+use pyo3::types::PyTuple;
 use std::collections::HashMap;
+use std::sync::Arc;
 
 use crate::errors::{MetricQueryError, MetricQueryResult};
 use crate::models::Metric;
+use crate::models::labels::label_names;
 use crate::plugins::{
     FilterPlugin, AggregationPlugin, TimeGroupingPlugin,
     with_registry
@@ -13,6 +18,11 @@ use crate::plugin_impls::{LabelFilter, LabelInFilter};
 pub trait TransformationStrategy: Send + Sync {
     /// Apply the transformation to a collection of metrics
     fn apply(&self, metrics: &[Metric]) -> MetricQueryResult<Vec<Metric>>;
+
+    /// The filter this transformation applies, if it only filters metrics
+    fn as_filter(&self) -> Option<&dyn FilterPlugin> {
+        None
+    }
 }
 
 /// Filter transformation strategy
@@ -43,6 +53,10 @@ impl TransformationStrategy for FilterTransformation {
         
         Ok(result)
     }
+
+    fn as_filter(&self) -> Option<&dyn FilterPlugin> {
+        Some(self.filter.as_ref())
+    }
 }
 
 /// Aggregation transformation strategy
@@ -72,8 +86,8 @@ impl TransformationStrategy for AggregationTransformation {
         // Use with_capacity for optimal memory allocation
         let mut result = Vec::with_capacity(1);
         // Preserve label if present in first metric
-        let label = metrics[0].label.clone();
-        result.push(Metric { value, timestamp, label });
+        let label_id = metrics[0].label_id;
+        result.push(Metric { value, timestamp, label_id });
         
         Ok(result)
     }
@@ -120,25 +134,61 @@ impl TransformationStrategy for TimeGroupingTransformation {
             // Create temporary metrics for the aggregation
             let group_metrics: Vec<Metric> = values
                 .into_iter()
-                .map(|value| Metric { value, timestamp: 0, label: None }) // Timestamp doesn't matter for aggregation
+                .map(|value| Metric { value, timestamp: 0, label_id: None }) // Timestamp doesn't matter for aggregation
                 .collect();
             
             let value = self.aggregation.apply(&group_metrics)?;
             // For grouped metrics, we don't have a meaningful label to preserve
-            result.push(Metric { value, timestamp, label: None });
+            result.push(Metric { value, timestamp, label_id: None });
         }
         
         Ok(result)
     }
 }
 
+/// Apply transformation strategies in order, fusing consecutive filters
+///
+/// A run of filters is evaluated in a single pass that keeps the metrics
+/// passing all of them, so no intermediate list is built between filters.
+/// Filters after the first step narrow the previous result in place.
+fn run_strategies(
+    metrics: &[Metric],
+    strategies: &[Arc<dyn TransformationStrategy>],
+) -> MetricQueryResult<Vec<Metric>> {
+    let mut current: Option<Vec<Metric>> = None;
+    let mut i = 0;
+    while i < strategies.len() {
+        if strategies[i].as_filter().is_none() {
+            let input = current.as_deref().unwrap_or(metrics);
+            current = Some(strategies[i].apply(input)?);
+            i += 1;
+            continue;
+        }
+
+        let mut filters: Vec<&dyn FilterPlugin> = Vec::new();
+        while let Some(filter) = strategies.get(i).and_then(|strategy| strategy.as_filter()) {
+            filters.push(filter);
+            i += 1;
+        }
+        let keep = |metric: &Metric| filters.iter().all(|filter| filter.apply(metric));
+        current = Some(match current.take() {
+            Some(mut owned) => {
+                owned.retain(|metric| keep(metric));
+                owned
+            }
+            None => metrics.iter().filter(|metric| keep(metric)).cloned().collect(),
+        });
+    }
+    Ok(current.unwrap_or_else(|| metrics.to_vec()))
+}
+
 /// Pipeline for chaining transformations
 #[pyclass]
 pub struct MetricPipeline {
-    #[pyo3(get)]
-    metrics: Vec<Metric>,
+    // Shared with clones of the pipeline, which never modify the input
+    metrics: Arc<Vec<Metric>>,
     // We'll use an internal Vec for strategies
-    strategies: Vec<Box<dyn TransformationStrategy>>,
+    strategies: Vec<Arc<dyn TransformationStrategy>>,
 }
 
 #[pymethods]
@@ -149,17 +199,35 @@ impl MetricPipeline {
         // Estimate initial capacity for strategies
         // Most pipelines have 2-5 transformations, so 5 is a reasonable starting point
         Self {
-            metrics,
+            metrics: Arc::new(metrics),
             strategies: Vec::with_capacity(5),
         }
     }
     
+    /// The metrics the pipeline was created with
+    #[getter]
+    pub fn metrics(&self) -> Vec<Metric> {
+        self.metrics.as_ref().clone()
+    }
+    
+    /// Create a copy of the pipeline with the same metrics and transformations
+    ///
+    /// The metrics and transformations are shared rather than copied, so a
+    /// pipeline can be set up once and cloned cheaply for each variation.
+    #[pyo3(name = "clone")]
+    pub fn clone_pipeline(&self) -> Self {
+        Self {
+            metrics: Arc::clone(&self.metrics),
+            strategies: self.strategies.clone(),
+        }
+    }
+    
     /// Add a filter transformation to the pipeline
     pub fn filter(&mut self, _py: Python<'_>, filter_type: &str, _filter_value: i64) -> PyResult<()> {
         with_registry(|registry| {
             // Find the filter
             if let Some(filter) = registry.get_filter(filter_type) {
-                self.strategies.push(Box::new(FilterTransformation::new(filter.clone())));
+                self.strategies.push(Arc::new(FilterTransformation::new(filter.clone())));
                 Ok(())
             } else {
                 Err(pyo3::exceptions::PyValueError::new_err(
@@ -174,7 +242,7 @@ impl MetricPipeline {
         with_registry(|registry| {
             // Find the aggregation
             if let Some(aggregation) = registry.get_aggregation(agg_type) {
-                self.strategies.push(Box::new(AggregationTransformation::new(aggregation.clone())));
+                self.strategies.push(Arc::new(AggregationTransformation::new(aggregation.clone())));
                 Ok(())
             } else {
                 Err(pyo3::exceptions::PyValueError::new_err(
@@ -203,7 +271,7 @@ impl MetricPipeline {
                     format!("Unknown aggregation type: {}", agg_type)
                 ))?;
             
-            self.strategies.push(Box::new(TimeGroupingTransformation::new(
+            self.strategies.push(Arc::new(TimeGroupingTransformation::new(
                 time_grouping.clone(),
                 aggregation.clone(),
             )));
@@ -217,7 +285,7 @@ impl MetricPipeline {
         if filter_type == "label_eq" {
             // Create a new label filter directly
             let filter_box: Box<dyn FilterPlugin> = Box::new(LabelFilter::new(label));
-            self.strategies.push(Box::new(FilterTransformation::new(filter_box)));
+            self.strategies.push(Arc::new(FilterTransformation::new(filter_box)));
             Ok(())
         } else {
             Err(pyo3::exceptions::PyValueError::new_err(
@@ -231,7 +299,7 @@ impl MetricPipeline {
         if filter_type == "label_in" {
             // Create a new label_in filter directly
             let filter_box: Box<dyn FilterPlugin> = Box::new(LabelInFilter::new(labels));
-            self.strategies.push(Box::new(FilterTransformation::new(filter_box)));
+            self.strategies.push(Arc::new(FilterTransformation::new(filter_box)));
             Ok(())
         } else {
             Err(pyo3::exceptions::PyValueError::new_err(
@@ -242,30 +310,69 @@ impl MetricPipeline {
     
     /// Execute the pipeline and return the result
     pub fn execute(&self) -> PyResult<Vec<Metric>> {
-        // Only clone the metrics once at the end if no transformations are applied
-        // This avoids unnecessary cloning during intermediate steps
-        if self.strategies.is_empty() {
-            return Ok(self.metrics.clone());
-        }
-        
-        // Apply the first transformation directly on the original metrics
-        let mut result = match self.strategies[0].apply(&self.metrics) {
-            Ok(transformed) => transformed,
-            Err(e) => return Err(pyo3::exceptions::PyValueError::new_err(
-                format!("Error executing transformation: {:?}", e)
-            )),
+        run_strategies(&self.metrics, &self.strategies).map_err(|e| {
+            PyValueError::new_err(format!("Error executing transformation: {:?}", e))
+        })
+    }
+    
+    /// Add a list of operations and execute the pipeline in a single call
+    ///
+    /// Each operation is a tuple of a pipeline method name and its arguments,
+    /// e.g. `("filter_by_label", "label_eq", "cpu")` or `("aggregate", "avg")`.
+    /// The pipeline itself is left unchanged.
+    pub fn execute_fused<'py>(&self, py: Python<'py>, ops: Vec<Bound<'py, PyTuple>>) -> PyResult<Vec<Metric>> {
+        self.with_ops(py, &ops)?.execute()
+    }
+    
+    /// Execute the pipeline and return the result as columns
+    ///
+    /// Returns `(values, timestamps, labels)`, with the values and timestamps
+    /// as NumPy arrays, so callers can work on the result without reading
+    /// each metric's attributes. Optional `ops` are applied as in `execute_fused`.
+    #[pyo3(signature = (ops=None))]
+    pub fn execute_columns<'py>(
+        &self,
+        py: Python<'py>,
+        ops: Option<Vec<Bound<'py, PyTuple>>>,
+    ) -> PyResult<(Bound<'py, PyArray1<i64>>, Bound<'py, PyArray1<i64>>, Vec<Option<String>>)> {
+        let result = match ops {
+            Some(ops) => self.with_ops(py, &ops)?.execute()?,
+            None => self.execute()?,
         };
-        
-        // Apply remaining transformations sequentially
-        for strategy in &self.strategies[1..] {
-            result = match strategy.apply(&result) {
-                Ok(transformed) => transformed,
-                Err(e) => return Err(pyo3::exceptions::PyValueError::new_err(
-                    format!("Error executing transformation: {:?}", e)
-                )),
-            };
+        let values: Vec<i64> = result.iter().map(|metric| metric.value).collect();
+        let timestamps: Vec<i64> = result.iter().map(|metric| metric.timestamp).collect();
+        let labels = label_names(result.iter().map(|metric| metric.label_id))?;
+        Ok((PyArray1::from_vec(py, values), PyArray1::from_vec(py, timestamps), labels))
+    }
+}
+
+impl MetricPipeline {
+    /// Create a copy of the pipeline with a list of operations added
+    fn with_ops<'py>(&self, py: Python<'py>, ops: &[Bound<'py, PyTuple>]) -> PyResult<Self> {
+        let mut pipeline = self.clone_pipeline();
+        for op in ops {
+            let name: String = op.get_item(0)?.extract()?;
+            match name.as_str() {
+                "filter" => pipeline.filter(py, &op.get_item(1)?.extract::<String>()?, op.get_item(2)?.extract()?)?,
+                "aggregate" => pipeline.aggregate(py, &op.get_item(1)?.extract::<String>()?)?,
+                "group_by_time" => pipeline.group_by_time(
+                    py,
+                    &op.get_item(1)?.extract::<String>()?,
+                    &op.get_item(2)?.extract::<String>()?,
+                )?,
+                "filter_by_label" => pipeline.filter_by_label(
+                    py,
+                    &op.get_item(1)?.extract::<String>()?,
+                    op.get_item(2)?.extract()?,
+                )?,
+                "filter_by_labels" => pipeline.filter_by_labels(
+                    py,
+                    &op.get_item(1)?.extract::<String>()?,
+                    op.get_item(2)?.extract()?,
+                )?,
+                _ => return Err(PyValueError::new_err(format!("Unknown pipeline operation: {}", name))),
+            }
         }
-        
-        Ok(result)
+        Ok(pipeline)
     }
 }
\ No newline at end of file